@@ -1,16 +1,647 @@
+import bisect
+import contextlib
+import copy
+import functools
+import hashlib
+import importlib
+import importlib.util
+import io
+import json
+import logging
+import os
+import pickle
+import queue
+import re
+import shutil
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+from pathlib import Path
+from urllib.parse import quote, unquote
+
 import streamlit as st
 import pandas as pd
 import numpy as np
+from pandas.api.types import union_categoricals
+from streamlit.runtime.scriptrunner import add_script_run_ctx
 
 # Set page config first
 st.set_page_config(page_title="HealthBot Dashboard", layout="wide")
 
-# Import plotting libraries after page config
-import matplotlib
-matplotlib.use('Agg')  # Use non-interactive backend
-import matplotlib.pyplot as plt
-import seaborn as sns
-import plotly.express as px
+# ---------- Lazy Imports ----------
+# The plotting libraries are only imported by the pages that draw with them,
+# so a session that never opens the heatmap never pays for seaborn
+@st.cache_resource
+def startup_profile():
+    """Seconds spent on each lazy import and warm-up step in this process"""
+    return {}
+
+
+def lazy_import(name):
+    """Import a module on first use, recording how long it took (including anything it pulled in)"""
+    # Always go through import_module: it waits for a module that the warm-up
+    # thread is still initialising instead of returning it half-built
+    loaded = name in sys.modules
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    if not loaded:
+        startup_profile()[f"import {name}"] = time.perf_counter() - start
+    return module
+
+
+def pyplot():
+    """matplotlib.pyplot on the non-interactive backend"""
+    if 'matplotlib.pyplot' not in sys.modules:
+        lazy_import('matplotlib').use('Agg')  # Use non-interactive backend
+    return lazy_import('matplotlib.pyplot')
+
+
+def _warm_up():
+    profile = startup_profile()
+    start = time.perf_counter()
+    plt = pyplot()
+    lazy_import('plotly.express')
+    lazy_import('seaborn')
+    # The first savefig builds the font cache, which dominates the first chart render
+    fig, ax = plt.subplots(figsize=(1, 1))
+    ax.plot([0, 1])
+    fig.savefig(io.BytesIO(), format='png')
+    plt.close(fig)
+    profile['warm-up total'] = time.perf_counter() - start
+
+
+@st.cache_resource
+def warm_up():
+    """Import and initialise the plotting stack in the background, once per process"""
+    thread = threading.Thread(target=_warm_up, name="healthbot-warm-up", daemon=True)
+    # Lets the thread reach the cached startup profile without "missing ScriptRunContext" warnings
+    add_script_run_ctx(thread)
+    thread.start()
+    return thread
+
+
+if os.environ.get("HEALTHBOT_WARM_UP", "1") == "1":
+    warm_up()
+
+# ---------- Instrumentation ----------
+# Opt-in with HEALTHBOT_PROFILE=1; when off, span() hands back one shared no-op context
+PROFILING = os.environ.get("HEALTHBOT_PROFILE") == "1"
+SPAN_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+rerun_started = time.perf_counter()
+
+
+class SpanStats:
+    """Per-stage latency histograms aggregated across every session in the process"""
+
+    def __init__(self):
+        self._spans = {}
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds):
+        with self._lock:
+            entry = self._spans.setdefault(name, {'buckets': [0] * (len(SPAN_BUCKETS) + 1), 'sum': 0.0, 'count': 0})
+            entry['buckets'][bisect.bisect_left(SPAN_BUCKETS, seconds)] += 1
+            entry['sum'] += seconds
+            entry['count'] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {name: {**entry, 'buckets': list(entry['buckets'])} for name, entry in self._spans.items()}
+
+    @staticmethod
+    def quantile(entry, q):
+        """Estimate a quantile by interpolating inside the histogram bucket that contains it"""
+        target = q * entry['count']
+        seen = 0
+        for i, count in enumerate(entry['buckets']):
+            if count and seen + count >= target:
+                lower = SPAN_BUCKETS[i - 1] if i else 0.0
+                upper = SPAN_BUCKETS[i] if i < len(SPAN_BUCKETS) else lower * 2
+                return lower + (upper - lower) * (target - seen) / count
+            seen += count
+        return float('nan')
+
+    def table(self):
+        rows = {
+            name: {'Count': entry['count'],
+                   'Mean (ms)': entry['sum'] / entry['count'] * 1000,
+                   'p50 (ms)': self.quantile(entry, 0.5) * 1000,
+                   'p95 (ms)': self.quantile(entry, 0.95) * 1000,
+                   'Total (s)': entry['sum']}
+            for name, entry in self.snapshot().items()
+        }
+        if not rows:
+            return pd.DataFrame()
+        return pd.DataFrame.from_dict(rows, orient='index').sort_values('Total (s)', ascending=False)
+
+    def to_json(self):
+        return json.dumps({'buckets': SPAN_BUCKETS, 'spans': self.snapshot()}, indent=2)
+
+    def to_prometheus(self):
+        lines = ["# HELP healthbot_span_seconds Time spent in instrumented dashboard stages",
+                 "# TYPE healthbot_span_seconds histogram"]
+        for name, entry in sorted(self.snapshot().items()):
+            cumulative = 0
+            for bound, count in zip(SPAN_BUCKETS + ('+Inf',), entry['buckets']):
+                cumulative += count
+                lines.append(f'healthbot_span_seconds_bucket{{span="{name}",le="{bound}"}} {cumulative}')
+            lines.append(f'healthbot_span_seconds_sum{{span="{name}"}} {entry["sum"]}')
+            lines.append(f'healthbot_span_seconds_count{{span="{name}"}} {entry["count"]}')
+        return "\n".join(lines) + "\n"
+
+
+@st.cache_resource
+def span_stats():
+    """One set of span histograms per process"""
+    return SpanStats()
+
+
+_NO_SPAN = contextlib.nullcontext()
+
+
+@contextlib.contextmanager
+def _timed_span(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        span_stats().record(name, time.perf_counter() - start)
+
+
+def span(name):
+    """Time a stage of the rerun when profiling is enabled"""
+    return _timed_span(name) if PROFILING else _NO_SPAN
+
+
+# ---------- Figure Render Cache ----------
+FIGURE_CACHE_BYTES = int(os.environ.get("FIGURE_CACHE_BYTES", 64 * 1024 * 1024))
+
+
+class FigureCache:
+    """Thread-safe LRU of rendered PNG bytes, evicting by total size"""
+
+    def __init__(self, max_bytes=FIGURE_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            png = self._entries.get(key)
+            if png is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return png
+
+    def put(self, key, png):
+        with self._lock:
+            if key in self._entries:
+                self.size -= len(self._entries.pop(key))
+            if len(png) > self.max_bytes:
+                return
+            self._entries[key] = png
+            self.size += len(png)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def stats(self):
+        with self._lock:
+            return {'backend': 'memory', 'entries': len(self._entries), 'bytes': self.size,
+                    'hits': self.hits, 'misses': self.misses}
+
+
+# ---------- Shared Cache ----------
+# With HEALTHBOT_CACHE_BACKEND=sqlite, worker processes on one host share rendered figures and
+# computed results through a SQLite file instead of each building their own
+CACHE_BACKEND = os.environ.get("HEALTHBOT_CACHE_BACKEND", "memory")
+SHARED_CACHE_BYTES = int(os.environ.get("SHARED_CACHE_BYTES", 512 * 1024 * 1024))
+SHARED_CACHE_TTL = float(os.environ.get("SHARED_CACHE_TTL", 24 * 60 * 60))  # Seconds
+SHARED_CACHE_SCHEMA = 1  # Bump when the layout of shared entries changes
+SHARED_CACHE_VERSION = (SHARED_CACHE_SCHEMA, hashlib.sha256(Path(__file__).read_bytes()).hexdigest()[:16],
+                        pd.__version__, np.__version__)
+
+
+def cache_address(key):
+    """Content address for a cache key: a digest of the inputs the value was computed from"""
+    return hashlib.sha256(repr(key).encode()).hexdigest()
+
+
+class SqliteCache:
+    """On-disk key-value store shared by every process on the host, evicting by TTL and total size
+
+    Same get/put/stats interface as FigureCache; hit and miss counts are per process.
+    Every key is combined with `version` (SHARED_CACHE_VERSION by default), so figures and
+    results written before any edit to app.py or a pandas/numpy upgrade are never read back.
+    Values are unpickled on read, so the file and its directory must only be writable by the
+    user the app runs as; anyone who can write to it can run code in every worker.
+    """
+
+    def __init__(self, path, max_bytes=SHARED_CACHE_BYTES, ttl=SHARED_CACHE_TTL, version=SHARED_CACHE_VERSION):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _db(self):
+        # sqlite3 connections can't be shared between threads, so each thread opens its own
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute("CREATE TABLE IF NOT EXISTS entries (address TEXT PRIMARY KEY, value BLOB NOT NULL, "
+                       "size INTEGER NOT NULL, expires REAL NOT NULL, accessed REAL NOT NULL)")
+            db.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+            self._local.db = db
+        return db
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def _address(self, key):
+        return cache_address((self.version, key))
+
+    def get(self, key):
+        db = self._db()
+        address, now = self._address(key), time.time()
+        row = db.execute("SELECT value FROM entries WHERE address = ? AND expires > ?", (address, now)).fetchone()
+        self._count(row is not None)
+        if row is None:
+            return None
+        db.execute("UPDATE entries SET accessed = ? WHERE address = ?", (now, address))
+        return row[0]
+
+    def put(self, key, value):
+        if len(value) > self.max_bytes:
+            return
+        db = self._db()
+        now = time.time()
+        with db:
+            db.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                       (self._address(key), value, len(value), now + self.ttl, now))
+            db.execute("DELETE FROM entries WHERE expires <= ?", (now,))
+            size = db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if size > self.max_bytes:
+                # Least recently used first, until the store fits again
+                evicted = []
+                for address, entry_size in db.execute("SELECT address, size FROM entries ORDER BY accessed"):
+                    if size <= self.max_bytes:
+                        break
+                    evicted.append((address,))
+                    size -= entry_size
+                db.executemany("DELETE FROM entries WHERE address = ?", evicted)
+
+    def stats(self):
+        entries, size = self._db().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        with self._lock:
+            return {'backend': 'sqlite', 'path': str(self.path), 'entries': entries, 'bytes': size,
+                    'hits': self.hits, 'misses': self.misses}
+
+
+@st.cache_resource
+def shared_cache():
+    """The host-wide cache when the sqlite backend is selected, otherwise None"""
+    if CACHE_BACKEND != "sqlite":
+        return None
+    return SqliteCache(Path(os.environ.get("SHARED_CACHE_PATH", CACHE_DIR / "shared-cache.sqlite")))
+
+
+def shared_result(func):
+    """Look a function's results up in the shared cache before computing them
+
+    Goes underneath st.cache_data/st.cache_resource, which stay the per-process first level.
+    The store versions every key (see SqliteCache), so an edit to app.py, including the
+    constants and the classes being pickled, starts from fresh entries.
+    """
+
+    @functools.wraps(func)
+    def cached(*args):
+        cache = shared_cache()
+        if cache is None:
+            return func(*args)
+        key = (func.__qualname__, args)
+        value = cache.get(key)
+        if value is not None:
+            try:
+                # Only safe because the store is writable by the app user alone (see SqliteCache)
+                return pickle.loads(value)
+            except Exception:
+                pass  # Written by an incompatible version of the app; recompute and overwrite
+        result = func(*args)
+        try:
+            cache.put(key, pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL))
+        except (pickle.PicklingError, AttributeError, TypeError):
+            pass  # Sharing is best effort; this process still has its own copy
+        return result
+
+    return cached
+
+
+@st.cache_resource
+def figure_cache():
+    """The render cache: host-wide with the sqlite backend, else one per process shared by every session"""
+    return shared_cache() or FigureCache()
+
+
+def figure_png(key, draw):
+    """PNG bytes for a matplotlib chart, only calling draw() when they aren't cached yet"""
+    key = key + (st.get_option("theme.base"),)
+    cache = figure_cache()
+    png = cache.get(key)
+    if png is None:
+        plt = pyplot()
+        with span("figure.draw"):
+            fig = draw()
+        with span("figure.tight_layout"):
+            fig.tight_layout()
+        with span("figure.savefig"):
+            buffer = io.BytesIO()
+            # Same settings st.pyplot uses, so cached charts look identical
+            fig.savefig(buffer, format='png', dpi=200, bbox_inches='tight')
+            plt.close(fig)
+        png = buffer.getvalue()
+        cache.put(key, png)
+    return png
+
+
+def render_figure(key, draw):
+    """Show a matplotlib chart from the render cache"""
+    png = figure_png(key, draw)
+    with span("figure.st_image"):
+        st.image(png, use_container_width=True)
+
+
+# ---------- Charts ----------
+# Visualizations describe each chart once as a Chart of pre-aggregated layers; the
+# browser backend turns it into a compact Plotly spec and the server backend into a PNG
+CHART_BACKENDS = ["Browser (interactive)", "Server (PNG)"]
+
+
+class ChartPanel:
+    """One set of axes: a title, axis labels and the layers drawn on it"""
+
+    def __init__(self, title, xlabel=None, ylabel=None, grid='both', legend=False, rotate_xticks=False):
+        self.title = title
+        self.xlabel = xlabel
+        self.ylabel = ylabel
+        self.grid = grid
+        self.legend = legend
+        self.rotate_xticks = rotate_xticks
+        self.layers = []
+
+    def bar(self, x, y, color, alpha=0.7):
+        self.layers.append(('bar', dict(x=x, y=y, color=color, alpha=alpha)))
+
+    def line(self, x, y, color, label=None, marker=None, alpha=1.0):
+        self.layers.append(('line', dict(x=x, y=y, color=color, label=label, marker=marker, alpha=alpha)))
+
+    def band(self, x, low, high, color, label=None):
+        self.layers.append(('band', dict(x=x, low=low, high=high, color=color, label=label)))
+
+    def histogram(self, counts, edges, color):
+        self.layers.append(('histogram', dict(counts=counts, edges=edges, color=color)))
+
+    def box(self, stats, color):
+        self.layers.append(('box', dict(stats=stats, color=color)))
+
+    def heatmap(self, matrix, annotate):
+        self.layers.append(('heatmap', dict(matrix=matrix, annotate=annotate)))
+
+
+class Chart:
+    """Backend-neutral chart made of side-by-side panels"""
+
+    def __init__(self, figsize=(12, 6)):
+        self.figsize = figsize
+        self.panels = []
+
+    def panel(self, title, **options):
+        panel = ChartPanel(title, **options)
+        self.panels.append(panel)
+        return panel
+
+
+def chart_to_matplotlib(chart):
+    plt = pyplot()
+    fig, axes = plt.subplots(1, len(chart.panels), figsize=chart.figsize, squeeze=False)
+    for ax, panel in zip(axes[0], chart.panels):
+        for kind, layer in panel.layers:
+            if kind == 'bar':
+                ax.bar(layer['x'], layer['y'], color=layer['color'], alpha=layer['alpha'])
+            elif kind == 'line':
+                ax.plot(layer['x'], layer['y'], marker=layer['marker'], linestyle='-', color=layer['color'],
+                        linewidth=2, markersize=6, alpha=layer['alpha'], label=layer['label'])
+            elif kind == 'band':
+                ax.fill_between(layer['x'], layer['low'], layer['high'], color=layer['color'], alpha=0.2,
+                                label=layer['label'])
+            elif kind == 'histogram':
+                ax.stairs(layer['counts'], layer['edges'], fill=True, color=layer['color'], alpha=0.7)
+                ax.stairs(layer['counts'], layer['edges'], color='black')
+            elif kind == 'box':
+                ax.bxp([layer['stats']], patch_artist=True,
+                       boxprops=dict(facecolor=layer['color'], alpha=0.7),
+                       medianprops=dict(color='red', linewidth=2))
+            elif kind == 'heatmap':
+                sns = lazy_import('seaborn')
+                sns.heatmap(layer['matrix'], annot=layer['annotate'], cmap="coolwarm",
+                            center=0, square=True, linewidths=1 if layer['annotate'] else 0,
+                            cbar_kws={"shrink": 0.8}, ax=ax, fmt='.2f')
+        if panel.xlabel:
+            ax.set_xlabel(panel.xlabel, fontsize=12)
+        if panel.ylabel:
+            ax.set_ylabel(panel.ylabel, fontsize=12)
+        ax.set_title(panel.title, fontsize=14, pad=20 if panel.grid is None else 6)
+        if panel.grid:
+            ax.grid(axis=panel.grid, alpha=0.3)
+        if panel.legend:
+            ax.legend(loc='upper left')
+        if panel.rotate_xticks:
+            ax.tick_params(axis='x', labelrotation=45)
+    return fig
+
+
+def _rgba(color, alpha):
+    red, green, blue = lazy_import('plotly.colors').hex_to_rgb(color)
+    return f"rgba({red}, {green}, {blue}, {alpha})"
+
+
+def chart_to_plotly(chart):
+    go = lazy_import('plotly.graph_objects')
+    make_subplots = lazy_import('plotly.subplots').make_subplots
+    fig = make_subplots(rows=1, cols=len(chart.panels), subplot_titles=[panel.title for panel in chart.panels])
+    for col, panel in enumerate(chart.panels, start=1):
+        traces = []
+        for kind, layer in panel.layers:
+            if kind == 'bar':
+                traces.append(go.Bar(x=layer['x'], y=layer['y'], marker_color=layer['color'],
+                                     opacity=layer['alpha'], showlegend=False))
+            elif kind == 'line':
+                traces.append(go.Scatter(x=layer['x'], y=layer['y'], mode='lines+markers' if layer['marker'] else 'lines',
+                                         line=dict(color=layer['color'], width=2), opacity=layer['alpha'],
+                                         name=layer['label'], showlegend=layer['label'] is not None))
+            elif kind == 'band':
+                traces.append(go.Scatter(x=layer['x'], y=layer['high'], mode='lines', line=dict(width=0),
+                                         showlegend=False, hoverinfo='skip'))
+                traces.append(go.Scatter(x=layer['x'], y=layer['low'], mode='lines', line=dict(width=0),
+                                         fill='tonexty', fillcolor=_rgba(layer['color'], 0.2), name=layer['label']))
+            elif kind == 'histogram':
+                edges = np.asarray(layer['edges'])
+                traces.append(go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=layer['counts'], width=np.diff(edges),
+                                     marker=dict(color=layer['color'], line=dict(color='black', width=1)),
+                                     opacity=0.7, showlegend=False))
+            elif kind == 'box':
+                stats = layer['stats']
+                name = panel.ylabel or panel.title
+                # Only the precomputed statistics go to the browser, never the raw column
+                traces.append(go.Box(x=[name], q1=[stats['q1']], median=[stats['med']], q3=[stats['q3']],
+                                     lowerfence=[stats['whislo']], upperfence=[stats['whishi']],
+                                     fillcolor=_rgba(layer['color'], 0.7), line=dict(color='black'),
+                                     showlegend=False))
+                if len(stats['fliers']):
+                    traces.append(go.Scatter(x=[name] * len(stats['fliers']), y=stats['fliers'], mode='markers',
+                                             marker=dict(color='black', size=5), showlegend=False))
+            elif kind == 'heatmap':
+                matrix = layer['matrix']
+                traces.append(go.Heatmap(z=matrix.to_numpy().round(3), x=list(matrix.columns), y=list(matrix.index),
+                                         colorscale='RdBu_r', zmid=0, zmin=-1, zmax=1,
+                                         texttemplate='%{z:.2f}' if layer['annotate'] else None))
+                fig.update_yaxes(autorange='reversed', row=1, col=col)
+        for trace in traces:
+            fig.add_trace(trace, row=1, col=col)
+        fig.update_xaxes(title_text=panel.xlabel, row=1, col=col)
+        fig.update_yaxes(title_text=panel.ylabel, row=1, col=col)
+    fig.update_layout(height=int(chart.figsize[1] * 80), legend=dict(x=0, y=1))
+    return fig
+
+
+def people_chart(frame, metric):
+    """Bar chart of one metric for the first 20 people (the default Visualizations view)"""
+    # Show only first 20 for readability
+    df_subset = frame.head(20)
+    chart = Chart()
+    panel = chart.panel(f"{metric} Distribution (First 20 People)", xlabel="Person Index", ylabel=metric, grid='y')
+    panel.bar(np.arange(len(df_subset)), df_subset[metric].to_numpy(), color='#0288d1')
+    return chart
+
+
+def show_chart(key, build, backend):
+    """Draw a Chart in the browser, or on the server as a cached PNG; build() makes the Chart"""
+    if backend == "Server (PNG)":
+        render_figure(key, lambda: chart_to_matplotlib(build()))
+        return
+    with span("chart.plotly"):
+        st.plotly_chart(chart_to_plotly(build()), use_container_width=True)
+    # Server-side PNGs stay available for exports
+    if st.button("Export as PNG", key=f"export-{key}"):
+        with st.spinner("Rendering PNG..."):
+            png = figure_png(key, lambda: chart_to_matplotlib(build()))
+        st.download_button("Download PNG", png, file_name=f"{key[0].lower().replace(' ', '_')}.png",
+                           mime="image/png", key=f"download-{key}")
+
+
+# ---------- Home Page Assets ----------
+# Built from constants, so each one is rendered once per process rather than per visit
+@st.cache_resource
+def bmi_pie_chart():
+    """BMI distribution pie for the Home page"""
+    px = lazy_import('plotly.express')
+    bmi_data = pd.DataFrame({
+        "BMI Category": ["Underweight", "Normal", "Overweight", "Obese"],
+        "Count": [50, 400, 300, 125]
+    })
+    return px.pie(bmi_data, names="BMI Category", values="Count",
+                  title="BMI Distribution", color_discrete_sequence=px.colors.sequential.Pinkyl)
+
+
+# Screening results are full-length flag frames, so only a few (data, rules) versions stay cached:
+# the published one, the one reruns may still read, and room for a rules edit
+SCREENING_CACHE_ENTRIES = 4
+
+
+@st.cache_resource(max_entries=SCREENING_CACHE_ENTRIES)
+def heart_pie_chart(path, signature, rules_signature):
+    """Heart disease risk pie from the cohort screening, rebuilt only when the data or rules change
+
+    The flag counts risk factors rather than diagnoses, so the chart is labelled as risk.
+    None when the dataset lacks the columns to screen for heart disease
+    """
+    px = lazy_import('plotly.express')
+    flags, _ = cohort_screening(path, signature, rules_signature)
+    if 'Heart Disease' not in flags:
+        return None
+    composite = next((composite for composite in wellness_rules(RULES_PATH, rules_signature).composites
+                      if composite['condition'] == 'Heart Disease'), None)
+    flagged = int(flags['Heart Disease'].sum())
+    heart_data = pd.DataFrame({
+        "Heart disease risk": ["At risk", "Not at risk"],
+        "Count": [flagged, len(flags) - flagged]
+    })
+    title = "Heart Disease Risk"
+    if composite is not None:
+        title += f" (≥{composite['min_factors']} of {len(composite['factors'])} risk factors)"
+    return px.pie(heart_data, names="Heart disease risk", values="Count",
+                  title=title, color_discrete_sequence=px.colors.sequential.Teal)
+
+
+def draw_health_trends(person, trends, resolution):
+    plt = pyplot()
+    fig, ax = plt.subplots(figsize=(10,4))
+    marker = 'o' if len(trends) <= 60 else None
+
+    ax.plot(trends['Date'], trends['Weight'], marker=marker, label="Weight (kg)", color="#ff4081", linewidth=2)
+    ax2 = ax.twinx()
+    ax2.plot(trends['Date'], trends['Steps'], marker='s' if marker else None, label="Steps per Day",
+             color="#0288d1", linewidth=2)
+    
+    ax.set_xlabel("Week" if resolution == "weekly" else "Day", fontsize=12)
+    ax.set_ylabel("Weight (kg)", fontsize=12, color="#ff4081")
+    ax2.set_ylabel("Steps per Day", fontsize=12, color="#0288d1")
+    ax.set_title(f"{person}'s Health Trends ({resolution})", fontsize=14)
+    ax.legend(loc='upper left')
+    ax2.legend(loc='upper right')
+    ax.grid(True, alpha=0.3)
+    fig.autofmt_xdate()
+    return fig
+
+
+def draw_sample_averages():
+    plt = pyplot()
+    health_metrics = ['BMI', 'Heart Rate', 'Blood Pressure', 'Cholesterol']
+    avg_values = [22.5, 72, 120, 180]
+    colors = ['#ff4081', '#0288d1', '#ff80ab', '#81d4fa']
+
+    fig, ax = plt.subplots(figsize=(8,5))
+    bars = ax.bar(health_metrics, avg_values, color=colors, alpha=0.8)
+    ax.set_ylabel("Average Value", fontsize=12)
+    ax.set_title("Sample Average Health Metrics", fontsize=14)
+    ax.grid(axis='y', alpha=0.3)
+    
+    # Add value labels on bars
+    for bar in bars:
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2., height,
+                f'{height:.1f}',
+                ha='center', va='bottom', fontsize=10)
+    return fig
+
 
 # ---------- Custom CSS ----------
 st.markdown("""
@@ -67,9 +698,160 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
-# ---------- Create Sample Dataset ----------
-@st.cache_data
-def load_data():
+# ---------- Data Ingestion ----------
+DATA_PATH = Path(os.environ.get("HEALTH_DATA_PATH", Path(__file__).with_name("health_data.csv")))
+CACHE_DIR = Path(os.environ.get("HEALTH_CACHE_DIR", Path(__file__).with_name(".cache")))
+CSV_CHUNKSIZE = 250_000
+
+# Compact dtypes for the CSV export; columns not listed here are inferred per chunk.
+# Integers parse as nullable so a blank cell doesn't fail the load (see prepare_chunk)
+CSV_DTYPES = {
+    'Name': 'category',
+    'Age': 'Int16',
+    'Height_m': 'float32',
+    'Weight_kg': 'float32',
+    'Steps_per_day': 'Int32',
+    'Sleep_hours': 'float32',
+    'Water_intake_liters': 'float32',
+    'Heart_Rate': 'Int16',
+    'Blood_Pressure': 'Int16',
+    'Cholesterol': 'Int16',
+    'Blood_Sugar': 'Int16'
+}
+REQUIRED_CSV_COLUMNS = ['Name', 'Age', 'Height_m', 'Weight_kg']
+CSV_RENAMES = {'Height_m': 'Height', 'Weight_kg': 'Weight'}
+APPEND_CHECK_BYTES = 64 * 1024  # Tail of the previous file that must be unchanged for an incremental reload
+ARROW_SOURCE_KEY = b'healthbot.source'
+
+
+def data_signature(path):
+    """Cheap change marker for a data file (size + mtime), None if it doesn't exist"""
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+
+def prepare_chunk(chunk):
+    """Compact dtypes, export column names and the derived BMI for one parsed chunk"""
+    # Never keep float64 copies of the extra columns around
+    for col in chunk.select_dtypes(include='float64').columns:
+        chunk[col] = chunk[col].astype('float32')
+    # Nullable integers go back to plain numpy ones, or to float32 with NaN where cells were blank,
+    # since everything downstream works on numpy arrays and already skips NaN
+    for col in chunk.select_dtypes(include=['Int16', 'Int32']).columns:
+        if chunk[col].hasnans:
+            chunk[col] = chunk[col].to_numpy(dtype='float32', na_value=np.nan)
+        else:
+            chunk[col] = chunk[col].to_numpy(dtype=chunk[col].dtype.numpy_dtype)
+    chunk = chunk.rename(columns=CSV_RENAMES)
+    chunk['BMI'] = (chunk['Weight'] / chunk['Height'] ** 2).round(2).astype('float32')
+    return chunk
+
+
+def combine_chunks(chunks):
+    # Per-chunk categories differ, so union them instead of letting concat fall back to object
+    names = union_categoricals([chunk['Name'] for chunk in chunks])
+    frame = pd.concat([chunk.drop(columns='Name') for chunk in chunks], ignore_index=True)
+    frame.insert(0, 'Name', names)
+    return frame
+
+
+def csv_dtypes(path):
+    """Compact dtypes for a health CSV, after checking its header has the required columns"""
+    header = pd.read_csv(path, nrows=0).columns
+    missing = [col for col in REQUIRED_CSV_COLUMNS if col not in header]
+    if missing:
+        raise ValueError(f"{path.name} is missing required columns: {', '.join(missing)}")
+    return header, {col: dtype for col, dtype in CSV_DTYPES.items() if col in header}
+
+
+def read_health_csv(path, chunksize=CSV_CHUNKSIZE):
+    """Stream a health CSV export in chunks with compact dtypes and a validated schema"""
+    _, dtypes = csv_dtypes(path)
+    chunks = [prepare_chunk(chunk) for chunk in pd.read_csv(path, dtype=dtypes, chunksize=chunksize)]
+    if not chunks:
+        raise ValueError(f"{path.name} contains no rows")
+    return combine_chunks(chunks)
+
+
+def csv_fingerprint(path, size):
+    """Digest of the bytes just before `size`, to tell an appended file from a rewritten one"""
+    with open(path, 'rb') as f:
+        f.seek(max(size - APPEND_CHECK_BYTES, 0))
+        block = f.read(min(size, APPEND_CHECK_BYTES))
+    # Appends only count when the previous version ended on a complete row
+    return hashlib.sha256(block).hexdigest() if block.endswith(b'\n') else None
+
+
+def append_health_csv(path, previous):
+    """Frame for a CSV that only grew since the `previous` Arrow copy, parsing just the new rows
+
+    Returns the frame and how many of its rows came from the previous copy, or None when
+    the file was rewritten rather than appended to
+    """
+    pa = lazy_import('pyarrow')
+    table = pa.ipc.open_file(pa.memory_map(str(previous))).read_all()
+    source = json.loads((table.schema.metadata or {}).get(ARROW_SOURCE_KEY, b'{}'))
+    size, tail = source.get('size'), source.get('tail')
+    if tail is None or path.stat().st_size <= size or csv_fingerprint(path, size) != tail:
+        return None
+
+    header, dtypes = csv_dtypes(path)
+    with open(path, 'rb') as f:
+        f.seek(size)
+        rows = pd.read_csv(f, names=header, header=None, dtype=dtypes)
+    return combine_chunks([table.to_pandas(split_blocks=True), prepare_chunk(rows)]), len(table)
+
+
+def write_arrow(frame, target, source):
+    """Write an uncompressed single-batch Arrow file, recording what it was converted from"""
+    pa = lazy_import('pyarrow')
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    table = table.replace_schema_metadata({**table.schema.metadata, ARROW_SOURCE_KEY: json.dumps(source)})
+    partial = target.with_suffix(".partial")
+    # A single record batch, so columns don't have to be concatenated (copied) on load
+    lazy_import('pyarrow.feather').write_feather(table, str(partial), compression='uncompressed',
+                                                 chunksize=max(len(frame), 1))
+    partial.replace(target)
+
+
+def load_health_csv(path, signature):
+    """Read the CSV through an uncompressed Arrow copy keyed on the file signature
+
+    When the CSV only had rows appended since the last copy, just those rows are parsed.
+    Returns the frame, the memory map behind it (None when the copy couldn't be written) and,
+    for an append, the previous version's signature and row count (else None)
+    """
+    cached = CACHE_DIR / f"{path.stem}-{signature}.arrow"
+    parent = None
+    if not cached.exists():
+        previous = next(CACHE_DIR.glob(f"{path.stem}-*.arrow"), None) if CACHE_DIR.is_dir() else None
+        appended = append_health_csv(path, previous) if previous else None
+        if appended is None:
+            frame = read_health_csv(path)
+        else:
+            frame, rows = appended
+            parent = (previous.stem[len(path.stem) + 1:], rows)
+        size = int(signature.split('-')[0])
+        try:
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            for stale in CACHE_DIR.glob(f"{path.stem}-*.arrow"):
+                stale.unlink()
+            write_arrow(frame, cached, {'size': size, 'tail': csv_fingerprint(path, size)})
+        except OSError:
+            return frame, None, parent  # Read-only deployments just skip the converted copy
+
+    # Numeric columns become read-only views of the mapped pages, so the OS page cache
+    # holds one copy for every session and worker process
+    pa = lazy_import('pyarrow')
+    source = pa.memory_map(str(cached))
+    table = pa.ipc.open_file(source).read_all()
+    return table.to_pandas(split_blocks=True), source, parent
+
+
+def sample_data():
     """Create sample health data if CSV doesn't exist"""
     np.random.seed(42)  # For reproducibility
     data = {
@@ -85,23 +867,1284 @@ def load_data():
     }
     return pd.DataFrame(data)
 
-# Load data
-try:
-    df = load_data()
-    numeric_df = df.select_dtypes(include=['float64', 'int64'])
-    numeric_columns = numeric_df.columns.tolist()
-except Exception as e:
-    st.error(f"Error loading data: {e}")
-    st.stop()
+
+class SharedDataset:
+    """Read-only dataset shared by every session; callers must not modify the frame
+
+    `parent` is (signature, rows) when this version is an earlier one with rows appended
+    """
+
+    def __init__(self, frame, source=None, parent=None):
+        self.frame = frame
+        self.parent = parent
+        self.mapped = (0, 0)
+        if source is not None:
+            source.seek(0)
+            whole = source.read_buffer(source.size())
+            self.mapped = (whole.address, whole.size)
+
+    def numeric_columns(self):
+        """Numeric column names, without building a numeric copy of the frame"""
+        return [col for col, dtype in self.frame.dtypes.items() if pd.api.types.is_numeric_dtype(dtype)]
+
+    def memory(self):
+        """Per-column bytes and whether each column lives in the memory map or on the heap"""
+        start, size = self.mapped
+        rows = []
+        for col, values in self.frame.items():
+            deep = values.memory_usage(index=False, deep=True)
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                values = values.cat.codes
+            address = values.to_numpy().__array_interface__['data'][0]
+            rows.append({
+                'Column': col,
+                'Dtype': str(self.frame.dtypes[col]),
+                'Bytes': int(deep),
+                'Backing': 'memory-mapped' if start <= address < start + size else 'heap'
+            })
+        return pd.DataFrame(rows)
+
+
+@st.cache_resource
+def load_dataset(path, signature):
+    """Load health data once per process, falling back to sample data if the CSV doesn't exist"""
+    if signature is None:
+        return SharedDataset(sample_data())
+    return SharedDataset(*load_health_csv(path, signature))
+
+
+def load_data(path, signature):
+    """The shared health data frame (no per-caller copy)"""
+    return load_dataset(path, signature).frame
+
+# ---------- Memory Report ----------
+PROCESS_MEMORY_FIELDS = {'VmRSS': 'Resident', 'RssAnon': 'Private (heap)', 'RssFile': 'File-backed (shared)'}
+
+
+def process_memory():
+    """Resident memory of this process in bytes, split by backing (Linux only, else empty)"""
+    try:
+        status = Path('/proc/self/status').read_text()
+    except OSError:
+        return {}
+    memory = {}
+    for line in status.splitlines():
+        field, _, value = line.partition(':')
+        if field in PROCESS_MEMORY_FIELDS:
+            memory[PROCESS_MEMORY_FIELDS[field]] = int(value.split()[0]) * 1024
+    return memory
+
+
+def object_bytes(value):
+    """Approximate private size of a session state value"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    return sys.getsizeof(value)
+
+
+def session_memory():
+    """Bytes held by the current session's state, largest first"""
+    sizes = {str(key): object_bytes(value) for key, value in st.session_state.items()}
+    return pd.DataFrame({'Bytes': pd.Series(sizes, dtype='int64')}).sort_values('Bytes', ascending=False)
+
+# ---------- Row Filters ----------
+FILTER_BINS = 16           # Quantile bins per metric; thresholds snap to their edges
+FILTER_MAX_DISTINCT = 128  # Integer columns with this many values or fewer get one bin per value
+FILTER_CACHE_ENTRIES = 32  # Distinct predicates whose rows and aggregates stay cached
+FILTER_BITMAP_BINS = 31    # Above this many bins the per-bin bitmaps outgrow a 4-byte row order
+
+
+class BinnedIndex:
+    """Row index on a binned column, resolving any range of bins to a packed bitmap of rows
+
+    Up to FILTER_BITMAP_BINS bins it keeps one packed bitmap of the rows at or above each bin
+    ((bins + 1) * n/8 bytes), so a range is two lookups and an AND. With more bins it keeps
+    the row positions sorted by bin (4 bytes a row) and marks the slice a range covers
+    """
+
+    def __init__(self, values, edges, discrete):
+        values = np.asarray(values, dtype='float64')
+        self.edges = np.asarray(edges, dtype='float64')
+        self.discrete = discrete
+        self.size = len(values)
+        # Discrete bins are picked by value, continuous ranges by their edges
+        self.options = self.edges[:-1] if discrete else self.edges
+        # Narrow codes keep the per-bin comparisons and the sort cheap on millions of rows
+        codes = np.searchsorted(self.edges[1:-1], values, side='right').astype(np.int16)
+        codes[np.isnan(values)] = -1
+        bins = len(self.edges) - 1
+        if bins <= FILTER_BITMAP_BINS:
+            self.order = self.starts = None
+            self.bitmaps = np.zeros((bins + 1, (self.size + 7) // 8), dtype=np.uint8)
+            for b in range(bins):
+                self.bitmaps[b] = np.packbits(codes >= b)
+        else:
+            self.bitmaps = None
+            self.order = np.argsort(codes, kind='stable').astype(np.int32 if self.size < 2**31 else np.int64)
+            # Rows of bin b are order[starts[b]:starts[b + 1]]; missing values sort before bin 0
+            self.starts = np.searchsorted(codes[self.order], np.arange(bins + 1))
+
+    @classmethod
+    def for_column(cls, values):
+        values = np.asarray(values, dtype='float64')
+        finite = values[~np.isnan(values)]
+        if not len(finite):
+            return cls(values, [0.0, 1.0], discrete=True)
+        low, high = finite.min(), finite.max()
+        if high - low < FILTER_MAX_DISTINCT and np.array_equal(finite, np.round(finite)):
+            return cls(values, np.arange(low, high + 2), discrete=True)
+        return cls(values, np.unique(np.quantile(finite, np.linspace(0, 1, FILTER_BINS + 1))), discrete=False)
+
+    def bins(self, first, last):
+        """Packed bitmap of the rows in bins first..last (inclusive)"""
+        if self.bitmaps is not None:
+            return self.bitmaps[first] & ~self.bitmaps[last + 1]
+        selected = np.zeros(self.size, dtype=bool)
+        selected[self.order[self.starts[first]:self.starts[last + 1]]] = True
+        return np.packbits(selected)
+
+    def label(self, value):
+        return f"{value:g}" if self.discrete else f"{value:,.2f}"
+
+    def select(self, low, high):
+        """Packed bitmap of the rows between two of the index's options"""
+        first = int(np.searchsorted(self.options, low))
+        last = int(np.searchsorted(self.options, high))
+        if not self.discrete:
+            last = max(last - 1, first)
+        return self.bins(first, last)
+
+
+@st.cache_resource
+def column_index(path, signature, column):
+    """Row index for one column, built the first time a filter uses it"""
+    return BinnedIndex.for_column(load_data(path, signature)[column].to_numpy(dtype='float64'))
+
+
+@st.cache_resource
+def bmi_category_index(path, signature):
+    """Bitmap index with one bin per BMI category"""
+    edges = np.concatenate([[-np.inf], BMI_BOUNDS, [np.inf]])
+    # BMI is stored rounded to 2 decimals in float32; undo the float32 error so 29.9 stays on the bound
+    bmi = np.round(load_data(path, signature)['BMI'].to_numpy(dtype='float64'), 2)
+    return BinnedIndex(bmi, edges, discrete=True)
+
+
+def filter_predicate(ranges, categories):
+    """Hashable predicate from (column, low, high) ranges and BMI categories, None when nothing is filtered"""
+    ranges = tuple(sorted((column, float(low), float(high)) for column, low, high in ranges))
+    categories = tuple(category for category in BMI_CATEGORIES if category in categories)
+    if len(categories) == len(BMI_CATEGORIES):
+        categories = None
+    if not ranges and categories is None:
+        return None
+    return ranges, categories
+
+
+@st.cache_resource(max_entries=FILTER_CACHE_ENTRIES)
+def filter_rows(path, signature, predicate):
+    """Positions of the rows matching a predicate"""
+    ranges, categories = predicate
+    bitmaps = [column_index(path, signature, column).select(low, high) for column, low, high in ranges]
+    if categories is not None:
+        index = bmi_category_index(path, signature)
+        selected = np.zeros((index.size + 7) // 8, dtype=np.uint8)
+        for category in categories:
+            code = BMI_CATEGORIES.index(category)
+            selected |= index.bins(code, code)
+        bitmaps.append(selected)
+    bitmap = np.bitwise_and.reduce(bitmaps)
+    return np.flatnonzero(np.unpackbits(bitmap, count=len(load_data(path, signature))))
+
+
+@st.cache_resource(max_entries=FILTER_CACHE_ENTRIES)
+def filtered_data(path, signature, predicate=None):
+    """The shared frame, or the read-only subset matching a predicate"""
+    frame = load_data(path, signature)
+    if predicate is None:
+        return frame
+    return frame.take(filter_rows(path, signature, predicate)).reset_index(drop=True)
+
+# ---------- Aggregate Store ----------
+class QuantileSketch:
+    """Merging t-digest: a bounded set of weighted centroids that answers quantile queries"""
+
+    def __init__(self, compression=200):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+
+    def update(self, values, weights=None):
+        values = np.asarray(values, dtype='float64')
+        weights = np.ones(len(values)) if weights is None else np.asarray(weights, dtype='float64')
+        keep = ~np.isnan(values) & (weights > 0)
+        values, weights = values[keep], weights[keep]
+        if not len(values):
+            return
+        means = np.concatenate([self.means, values])
+        weights = np.concatenate([self.weights, weights])
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+
+        # Merge neighbours that fall in the same unit of the arcsine scale function,
+        # which keeps centroids small near the tails and large around the median
+        cumulative = np.cumsum(weights)
+        q = (cumulative - weights / 2) / cumulative[-1]
+        k = np.floor(self.compression * (np.arcsin(2 * q - 1) / np.pi + 0.5))
+        starts = np.flatnonzero(np.diff(k, prepend=-1))
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / self.weights
+
+    def quantile(self, q):
+        if not len(self.means):
+            return float('nan')
+        centers = np.cumsum(self.weights) - self.weights / 2
+        return float(np.interp(q * self.weights.sum(), centers, self.means))
+
+
+class ColumnSummary:
+    """Running count/sum/min/max plus quantiles for one numeric column
+
+    Integer columns with a small range (the same ones the row filters bin per value) keep
+    exact per-value counts, since sketch centroids would blend neighbouring integers into
+    values no row has; anything else goes to a quantile sketch
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = float('inf')
+        self.max = float('-inf')
+        self.counts = np.zeros(0, dtype='int64')  # Rows per integer from self.min up, None once not discrete
+        self.sketch = QuantileSketch()
+
+    def update(self, values):
+        values = np.asarray(values, dtype='float64')
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+        low = self.min
+        self.count += len(values)
+        self.total += values.sum()
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+
+        if self.counts is not None:
+            if self.max - self.min < FILTER_MAX_DISTINCT and np.array_equal(values, np.round(values)):
+                counts = np.bincount((values - self.min).astype('int64'), minlength=int(self.max - self.min) + 1)
+                if len(self.counts):
+                    offset = int(low - self.min)
+                    counts[offset:offset + len(self.counts)] += self.counts
+                self.counts = counts
+                return
+            # No longer discrete: seed the sketch with what was counted so far
+            if len(self.counts):
+                self.sketch.update(low + np.arange(len(self.counts)), self.counts)
+            self.counts = None
+        self.sketch.update(values)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else float('nan')
+
+    def quantile(self, q):
+        if self.counts is not None and self.count:
+            # Exact, with numpy's default linear interpolation between neighbouring ranks
+            rank = (self.count - 1) * q
+            below = int(np.floor(rank))
+            cumulative = np.cumsum(self.counts)
+            lower, upper = self.min + np.searchsorted(cumulative, [below, min(below + 1, self.count - 1)], side='right')
+            return float(lower + (rank - below) * (upper - lower))
+        # The sketch interpolates between centroids, so pin the exact extremes
+        return min(max(self.sketch.quantile(q), self.min), self.max)
+
+
+def build_summaries(frame, chunksize=CSV_CHUNKSIZE):
+    """Summaries for every numeric column, fed in chunks to bound peak memory"""
+    columns = frame.select_dtypes(include='number').columns
+    summaries = {col: ColumnSummary() for col in columns}
+    for start in range(0, len(frame), chunksize):
+        chunk = frame.iloc[start:start + chunksize]
+        for col in columns:
+            summaries[col].update(chunk[col].to_numpy())
+    return summaries
+
+
+def append_rows(summaries, rows, chunksize=CSV_CHUNKSIZE):
+    """Fold newly added rows into existing summaries without rescanning the dataset"""
+    for start in range(0, len(rows), chunksize):
+        chunk = rows.iloc[start:start + chunksize]
+        for col, summary in summaries.items():
+            if col in chunk:
+                summary.update(chunk[col].to_numpy())
+
+
+@st.cache_resource
+def latest_aggregates():
+    """The newest full-dataset aggregate of each kind per data file, kept to fold appends into"""
+    return {}
+
+
+def incremental_aggregate(kind, path, signature, build, append):
+    """Full-dataset aggregate, derived from the previous version's when rows were only appended"""
+    dataset = load_dataset(path, signature)
+    latest = latest_aggregates()
+    previous = latest.get((kind, path))
+    if dataset.parent is not None and previous is not None and previous[0] == dataset.parent[0]:
+        # Published versions are shared and read-only, so extend a copy
+        aggregate = copy.deepcopy(previous[1])
+        append(aggregate, dataset.frame.iloc[dataset.parent[1]:])
+    else:
+        aggregate = build(dataset.frame)
+    latest[(kind, path)] = (signature, aggregate)
+    return aggregate
+
+
+@st.cache_resource(max_entries=FILTER_CACHE_ENTRIES)
+@shared_result
+def load_summaries(path, signature, predicate=None):
+    """Column summaries computed once per dataset version and filter, shared across sessions"""
+    if predicate is None:
+        return incremental_aggregate('summaries', path, signature, build_summaries, append_rows)
+    return build_summaries(filtered_data(path, signature, predicate))
+
+
+# ---------- Distribution Summaries ----------
+HISTOGRAM_BINS = 20
+OUTLIER_SAMPLE = 200  # Fliers drawn on the box plot; the rest only add render time
+
+
+@st.cache_data(max_entries=FILTER_CACHE_ENTRIES)
+@shared_result
+def distribution_summary(path, signature, metric, predicate=None):
+    """Fixed-bin histogram and box plot statistics for one column, independent of row count"""
+    values = filtered_data(path, signature, predicate)[metric].to_numpy(dtype='float64')
+    values = values[~np.isnan(values)]
+    counts, edges = np.histogram(values, bins=HISTOGRAM_BINS)
+
+    q1, median, q3 = np.quantile(values, [0.25, 0.5, 0.75])
+    iqr = q3 - q1
+    inside = values[(values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)]
+    outliers = values[(values < q1 - 1.5 * iqr) | (values > q3 + 1.5 * iqr)]
+    if len(outliers) > OUTLIER_SAMPLE:
+        outliers = np.random.default_rng(0).choice(outliers, OUTLIER_SAMPLE, replace=False)
+
+    box = {
+        'med': median, 'q1': q1, 'q3': q3,
+        'whislo': inside.min(), 'whishi': inside.max(),
+        'fliers': outliers, 'label': '1'
+    }
+    return {'counts': counts, 'edges': edges, 'box': box, 'count': len(values)}
+
+
+# ---------- Correlations ----------
+HEATMAP_ANNOTATE_MAX = 20  # Beyond this many metrics the cell labels are unreadable
+
+
+class CorrelationStats:
+    """Sufficient statistics for pairwise-complete Pearson correlations, updatable in place"""
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        k = len(self.columns)
+        self.shift = None
+        self.counts = np.zeros((k, k))
+        self.sums = np.zeros((k, k))      # sums[i, j]: sum of column i over rows where j is present
+        self.squares = np.zeros((k, k))
+        self.products = np.zeros((k, k))
+
+    def update(self, rows):
+        values = rows[self.columns].to_numpy(dtype='float64')
+        present = ~np.isnan(values)
+        if self.shift is None:
+            # Centering on the first batch's means keeps the running sums from cancelling out
+            self.shift = np.nan_to_num(np.nanmean(values, axis=0)) if len(values) else np.zeros(len(self.columns))
+        values = np.where(present, values - self.shift, 0.0)
+        present = present.astype('float64')
+        self.counts += present.T @ present
+        self.sums += values.T @ present
+        self.squares += (values ** 2).T @ present
+        self.products += values.T @ values
+
+    def matrix(self):
+        n = self.counts
+        with np.errstate(divide='ignore', invalid='ignore'):
+            covariance = n * self.products - self.sums * self.sums.T
+            variance = (n * self.squares - self.sums ** 2) * (n * self.squares - self.sums ** 2).T
+            corr = np.clip(covariance / np.sqrt(variance), -1, 1)
+        corr[n < 2] = np.nan
+        return pd.DataFrame(corr, index=self.columns, columns=self.columns)
+
+
+@st.cache_resource(max_entries=FILTER_CACHE_ENTRIES)
+@shared_result
+def load_correlations(path, signature, predicate=None):
+    """Correlation statistics built once per dataset version and filter in bounded-memory chunks"""
+    if predicate is None:
+        return incremental_aggregate('correlations', path, signature, build_correlations, update_correlations)
+    return build_correlations(filtered_data(path, signature, predicate))
+
+
+def build_correlations(frame):
+    stats = CorrelationStats(frame.select_dtypes(include='number').columns)
+    update_correlations(stats, frame)
+    return stats
+
+
+def update_correlations(stats, rows):
+    for start in range(0, len(rows), CSV_CHUNKSIZE):
+        stats.update(rows.iloc[start:start + CSV_CHUNKSIZE])
+
+
+def correlation_order(matrix):
+    """Order metrics along the leading eigenvector so correlated ones end up adjacent"""
+    _, vectors = np.linalg.eigh(np.nan_to_num(matrix.to_numpy()))
+    return np.argsort(vectors[:, -1])
+
+
+def top_correlations(matrix, k):
+    """The k metric pairs with the strongest correlation, in either direction"""
+    rows, cols = np.triu_indices(len(matrix), k=1)
+    values = matrix.to_numpy()[rows, cols]
+    order = np.argsort(-np.abs(np.nan_to_num(values)), kind='stable')[:k]
+    return pd.DataFrame({
+        'Metric A': matrix.columns[rows[order]],
+        'Metric B': matrix.columns[cols[order]],
+        'Correlation': values[order].round(3)
+    })
+
+
+# ---------- Chart Aggregation ----------
+LINE_MAX_POINTS = 1200  # About one point per horizontal pixel of a 12in chart
+
+
+def lttb(x, y, threshold):
+    """Largest-Triangle-Three-Buckets downsampling of a series sorted by x"""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return x, y
+
+    # First and last points are kept; the rest is split into threshold - 2 buckets
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    anchor = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = (edges[i + 1], edges[i + 2]) if i + 2 < len(edges) else (n - 1, n)
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        # Keep the point forming the largest triangle with the last kept point and the next bucket's average
+        area = np.abs((x[anchor] - avg_x) * (y[start:end] - y[anchor])
+                      - (x[anchor] - x[start:end]) * (avg_y - y[anchor]))
+        anchor = start + int(np.argmax(area))
+        selected[i + 1] = anchor
+    return x[selected], y[selected]
+
+
+@st.cache_data(max_entries=FILTER_CACHE_ENTRIES)
+@shared_result
+def age_trend_points(path, signature, metric, predicate=None, threshold=LINE_MAX_POINTS):
+    """Metric sorted by age and downsampled to a pixel-bounded number of points"""
+    frame = filtered_data(path, signature, predicate)
+    ages = frame['Age'].to_numpy(dtype='float64')
+    values = frame[metric].to_numpy(dtype='float64')
+    keep = ~(np.isnan(ages) | np.isnan(values))
+    ages, values = ages[keep], values[keep]
+    order = np.argsort(ages, kind='stable')
+    return lttb(ages[order], values[order], threshold)
+
+
+@st.cache_data(max_entries=FILTER_CACHE_ENTRIES)
+@shared_result
+def age_profile(path, signature, metric, bin_width, predicate=None):
+    """Mean, interquartile band and count of a metric per age bin"""
+    frame = filtered_data(path, signature, predicate)
+    bins = (frame['Age'] // bin_width) * bin_width
+    grouped = frame[metric].groupby(bins.rename('Age'))
+    profile = grouped.agg(['mean', 'count'])
+    quartiles = grouped.quantile([0.25, 0.75]).unstack()
+    profile['p25'] = quartiles[0.25]
+    profile['p75'] = quartiles[0.75]
+    return profile
+
+
+# ---------- BMI ----------
+BMI_CATEGORIES = ['Underweight', 'Normal', 'Overweight', 'Obese']
+BMI_BOUNDS = np.array([18.5, 24.9, 29.9])
+BMI_RANGES = ['< 18.5', '18.5 - 24.9', '25 - 29.9', '≥ 30']
+BMI_COLORS = ['#FFD700', '#4CAF50', '#FFA500', '#F44336']
+BMI_ADVICE = {
+    'Underweight': ("warning", "⚠️ Category: Underweight",
+                    "Consider consulting a nutritionist to develop a healthy weight gain plan."),
+    'Normal': ("success", "✅ Category: Normal weight",
+               "Great! Maintain your current lifestyle with balanced diet and regular exercise."),
+    'Overweight': ("warning", "⚠️ Category: Overweight",
+                   "Consider increasing physical activity and consulting a nutritionist for dietary advice."),
+    'Obese': ("error", "🚨 Category: Obese",
+              "It's recommended to consult with a healthcare provider for a comprehensive health plan.")
+}
+
+
+def bmi_table(height, weight):
+    """Vectorized BMI, category and position on the 4-slot BMI scale"""
+    height = np.asarray(height, dtype='float64')
+    weight = np.asarray(weight, dtype='float64')
+    # Categorize the BMI as shown and stored (2 decimals), like the filters and screening rules do
+    bmi = np.round(weight / height ** 2, 2)
+    codes = np.digitize(bmi, BMI_BOUNDS)
+
+    # Outer slots get a fixed marker, Normal/Overweight are placed linearly within their slot
+    position = np.select(
+        [codes == 0, codes == 1, codes == 2],
+        [0.5, 1 + (bmi - 18.5) / (24.9 - 18.5), 2 + (bmi - 25) / (29.9 - 25)],
+        3.5
+    )
+    codes = np.where(np.isnan(bmi), -1, codes)
+    position = np.where(np.isnan(bmi), np.nan, position)
+    return pd.DataFrame({
+        'Height': height,
+        'Weight': weight,
+        'BMI': bmi,
+        'Category': pd.Categorical.from_codes(codes, BMI_CATEGORIES),
+        'Scale_Position': position
+    })
+
+
+def batch_bmi(frame):
+    """BMI table, category counts and number of dropped rows for a cohort"""
+    frame = frame.rename(columns=CSV_RENAMES)
+    missing = [col for col in ('Height', 'Weight') if col not in frame]
+    if missing:
+        raise ValueError(f"missing columns: {', '.join(missing)}")
+    # A zero or negative height would give an infinite BMI and land in "Obese"
+    invalid = (frame['Height'] <= 0) | (frame['Weight'] <= 0)
+    if invalid.any():
+        frame = frame[~invalid]
+    table = bmi_table(frame['Height'], frame['Weight'])
+    if 'Name' in frame:
+        table.insert(0, 'Name', frame['Name'].to_numpy())
+    counts = table['Category'].value_counts(sort=False)
+    return table, counts, int(invalid.sum())
+
+
+BATCH_UPLOAD_ENTRIES = 8  # Uploaded CSVs whose BMI tables stay cached
+BATCH_UPLOAD_TTL = 3600   # Seconds an uploaded CSV's BMI table stays cached
+
+
+@st.cache_data(max_entries=BATCH_UPLOAD_ENTRIES, ttl=BATCH_UPLOAD_TTL)
+def batch_bmi_from_csv(data):
+    """Batch BMI for uploaded CSV bytes"""
+    frame = pd.read_csv(io.BytesIO(data), dtype={'Height': 'float32', 'Weight': 'float32',
+                                                 'Height_m': 'float32', 'Weight_kg': 'float32'})
+    return batch_bmi(frame)
+
+
+@st.cache_resource
+def batch_bmi_from_dataset(path, signature):
+    """Batch BMI for the loaded dataset, shared read-only like the dataset itself"""
+    return batch_bmi(load_data(path, signature))
+
+
+def batch_bmi_export(path, signature):
+    """CSV of the loaded dataset's BMI table, streamed to disk in chunks and reused while the data doesn't change"""
+    export = CACHE_DIR / f"{path.stem}-{signature}-bmi.csv"
+    if export.exists():
+        return export
+    frame = load_data(path, signature)
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    partial = export.with_suffix(".partial")
+    with open(partial, 'w', newline='', encoding='utf-8') as f:
+        for start in range(0, len(frame), CSV_CHUNKSIZE):
+            table, _, _ = batch_bmi(frame.iloc[start:start + CSV_CHUNKSIZE])
+            table.to_csv(f, header=start == 0, index=False)
+    partial.replace(export)
+    return export
+
+
+# ---------- Wellness Rules ----------
+RULES_PATH = Path(__file__).with_name("wellness_rules.json")
+RULE_OPERATORS = {'>': np.greater, '>=': np.greater_equal, '<': np.less, '<=': np.less_equal}
+
+
+class WellnessRules:
+    """Wellness advice indexed by condition, plus threshold rules that flag conditions from metrics"""
+
+    def __init__(self, rules):
+        self.advice = rules['conditions']
+        self.general = rules['general']
+        self.conditions = list(self.advice)
+        # Compile thresholds into (metric, ufunc, value, condition) once, grouped per condition
+        self.thresholds = {}
+        for rule in rules['thresholds']:
+            self.thresholds.setdefault(rule['condition'], []).append(
+                (rule['metric'], RULE_OPERATORS[rule['op']], rule['value']))
+        # Composite conditions are flagged when enough of their factor conditions are
+        self.composites = rules.get('composites', [])
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def suggestions(self, conditions):
+        """(emoji, type, message) tuples for any mix of conditions, with shared advice merged"""
+        conditions = [c for c in dict.fromkeys(conditions) if c in self.advice]
+        if not conditions:
+            tips = "\n".join(f"- {tip}" for tip in self.general['tips'])
+            return [("✅", "success", self.general['message']),
+                    ("💡", "info", f"**General Health Tips:**\n{tips}")]
+
+        entries = [self.advice[c] for c in conditions]
+        messages = [("⚠️", "warning", entry['alert']) for entry in entries]
+        consults = list(dict.fromkeys(entry['consult'] for entry in entries))
+        if len(consults) == 1:
+            messages.append(("👨‍⚕️", "info", f"**Consult:** {consults[0]}"))
+        else:
+            messages.append(("👨‍⚕️", "info", "**Consult:**\n" + "\n".join(f"- {c}" for c in consults)))
+        for emoji, key, heading in (("🥗", 'diet', "Diet Tips"), ("🏃", 'lifestyle', "Lifestyle Tips")):
+            tips = dict.fromkeys(tip for entry in entries for tip in entry[key])
+            messages.append((emoji, "success", f"**{heading}:**\n" + "\n".join(f"- {tip}" for tip in tips)))
+        return messages
+
+    def flag(self, frame):
+        """Boolean column per condition marking the rows that trip one of its thresholds"""
+        flags = {}
+        for condition, rules in self.thresholds.items():
+            mask = None
+            for metric, op, value in rules:
+                if metric in frame:
+                    values = frame[metric].to_numpy()
+                    # Compare at the column's precision, so a float32 BMI of 29.9 is on the 29.9 bound
+                    if values.dtype.kind == 'f':
+                        value = values.dtype.type(value)
+                    hit = op(values, value)
+                    mask = hit if mask is None else mask | hit
+            if mask is not None:
+                flags[condition] = mask
+        for composite in self.composites:
+            factors = [flags[factor] for factor in composite['factors'] if factor in flags]
+            # Too few measurable factors can never reach the threshold; leave the condition unscreened
+            if len(factors) >= composite['min_factors']:
+                mask = np.sum(factors, axis=0) >= composite['min_factors']
+                condition = composite['condition']
+                flags[condition] = flags[condition] | mask if condition in flags else mask
+        return pd.DataFrame(flags, index=frame.index)
+
+
+@st.cache_resource
+def wellness_rules(path, signature):
+    """Rules parsed once per version of the rules file"""
+    return WellnessRules.from_file(path)
+
+
+# ---------- Cohort Screening ----------
+@st.cache_resource(max_entries=SCREENING_CACHE_ENTRIES)
+def cohort_screening(path, signature, rules_signature):
+    """Risk flags for every row and per-category prevalence, once per dataset and rules version"""
+    frame = load_data(path, signature)
+    flags = wellness_rules(RULES_PATH, rules_signature).flag(frame)
+    return flags, flags.mean()
+
+
+def screening_export(path, signature, rules_signature):
+    """CSV of names and risk flags, streamed to disk in chunks and reused while nothing changes"""
+    export = CACHE_DIR / f"{path.stem}-{signature}-{rules_signature}-screening.csv"
+    if export.exists():
+        return export
+    frame = load_data(path, signature)
+    flags, _ = cohort_screening(path, signature, rules_signature)
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    partial = export.with_suffix(".partial")
+    with open(partial, 'w', newline='', encoding='utf-8') as f:
+        for start in range(0, len(frame), CSV_CHUNKSIZE):
+            rows = slice(start, start + CSV_CHUNKSIZE)
+            chunk = pd.concat([frame[['Name']].iloc[rows], flags.iloc[rows]], axis=1)
+            chunk.to_csv(f, header=start == 0, index=False)
+    partial.replace(export)
+    return export
+
+
+# ---------- Metric History ----------
+HISTORY_DIR = Path(os.environ.get("HEALTH_HISTORY_DIR", CACHE_DIR / "history"))
+# Synthetic people are only written into the default demo store, never into a configured one
+HISTORY_SEED = os.environ.get("HEALTHBOT_SEED_HISTORY", "0" if "HEALTH_HISTORY_DIR" in os.environ else "1") == "1"
+HISTORY_METRICS = ['Weight', 'Steps']
+HISTORY_EPOCH = np.datetime64('1970-01-01', 'D')
+HISTORY_PERIODS = {"1 month": 30, "3 months": 91, "1 year": 365, "All": None}
+
+
+class MetricHistory:
+    """Append-only daily metric history per person, one memory-mapped file per column
+
+    Every metric also keeps running sums and counts, so rolling means come from two
+    lookups per point, and date ranges are found by binary search over the day column.
+    Query cost depends on the range asked for, not on how long the history is.
+    """
+
+    COLUMN_DTYPES = {'day': 'int32', 'value': 'float32', 'sum': 'float64', 'count': 'int64'}
+
+    def __init__(self, root, metrics=HISTORY_METRICS):
+        self.root = Path(root)
+        self.metrics = list(metrics)
+        self._lock = threading.Lock()
+
+    def _columns(self):
+        yield 'day', self.COLUMN_DTYPES['day']
+        for metric in self.metrics:
+            yield metric, self.COLUMN_DTYPES['value']
+            yield f"{metric}.sum", self.COLUMN_DTYPES['sum']
+            yield f"{metric}.count", self.COLUMN_DTYPES['count']
+
+    def _path(self, person, column):
+        return self.root / quote(str(person), safe='') / f"{column}.bin"
+
+    def _column(self, person, column, dtype, n):
+        if not n:
+            return np.empty(0, dtype)
+        return np.memmap(self._path(person, column), dtype=dtype, mode='r', shape=(n,))
+
+    def people(self):
+        if not self.root.exists():
+            return []
+        return sorted(unquote(folder.name) for folder in self.root.iterdir() if folder.is_dir())
+
+    def length(self, person):
+        """Rows present in every column, which ignores a half-finished append"""
+        lengths = []
+        for column, dtype in self._columns():
+            path = self._path(person, column)
+            lengths.append(path.stat().st_size // np.dtype(dtype).itemsize if path.exists() else 0)
+        return min(lengths)
+
+    def last_day(self, person):
+        n = self.length(person)
+        return HISTORY_EPOCH + int(self._column(person, 'day', 'int32', n)[n - 1]) if n else None
+
+    def append(self, person, dates, values):
+        """Add days after the last stored one, with one value per day for every metric"""
+        days = (np.asarray(dates, dtype='datetime64[D]') - HISTORY_EPOCH).astype('int32')
+        if not len(days):
+            return
+        with self._lock:
+            n = self.length(person)
+            stored_days = self._column(person, 'day', 'int32', n)
+            if np.any(np.diff(days) <= 0) or (n and days[0] <= stored_days[-1]):
+                raise ValueError("history is append-only: days must increase and follow the last stored day")
+
+            new = {'day': days}
+            for metric in self.metrics:
+                value = np.asarray(values[metric], dtype='float32')
+                valid = ~np.isnan(value)
+                last_sum = self._column(person, f"{metric}.sum", 'float64', n)[-1] if n else 0.0
+                last_count = self._column(person, f"{metric}.count", 'int64', n)[-1] if n else 0
+                new[metric] = value
+                new[f"{metric}.sum"] = last_sum + np.cumsum(np.where(valid, value, 0), dtype='float64')
+                new[f"{metric}.count"] = last_count + np.cumsum(valid, dtype='int64')
+
+            self._path(person, 'day').parent.mkdir(parents=True, exist_ok=True)
+            for column, dtype in self._columns():
+                path = self._path(person, column)
+                with open(path, 'ab') as f:
+                    f.truncate(n * np.dtype(dtype).itemsize)  # Drop any torn tail from an interrupted append
+                    f.write(np.ascontiguousarray(new[column], dtype=dtype).tobytes())
+
+    def _range(self, person, start, end):
+        n = self.length(person)
+        days = self._column(person, 'day', 'int32', n)
+        lo = 0 if start is None else np.searchsorted(days, (np.datetime64(start, 'D') - HISTORY_EPOCH).astype('int32'))
+        hi = n if end is None else np.searchsorted(days, (np.datetime64(end, 'D') - HISTORY_EPOCH).astype('int32'),
+                                                   side='right')
+        return n, days, lo, hi
+
+    def query(self, person, start=None, end=None, window=7):
+        """Daily values in [start, end] with their rolling mean over the previous `window` days"""
+        n, days, lo, hi = self._range(person, start, end)
+        in_range = np.asarray(days[lo:hi])
+        result = {'Date': HISTORY_EPOCH + in_range.astype('timedelta64[D]')}
+        first = np.searchsorted(days, in_range - (window - 1))
+        for metric in self.metrics:
+            sums = self._column(person, f"{metric}.sum", 'float64', n)
+            counts = self._column(person, f"{metric}.count", 'int64', n)
+            before = first - 1
+            total = sums[lo:hi] - np.where(first > 0, sums[before], 0.0)
+            count = counts[lo:hi] - np.where(first > 0, counts[before], 0)
+            result[metric] = np.asarray(self._column(person, metric, 'float32', n)[lo:hi])
+            with np.errstate(invalid='ignore', divide='ignore'):
+                result[f"{metric} ({window}d avg)"] = np.where(count > 0, total / count, np.nan)
+        return pd.DataFrame(result)
+
+    def weekly(self, person, start=None, end=None):
+        """Mean of each metric per Monday-based week in [start, end]"""
+        n, days, lo, hi = self._range(person, start, end)
+        in_range = np.asarray(days[lo:hi])
+        if not len(in_range):
+            return pd.DataFrame(columns=['Date', *self.metrics])
+        weeks = (in_range + 3) // 7  # 1970-01-01 was a Thursday
+        starts = np.flatnonzero(np.diff(weeks, prepend=weeks[0] - 1))
+        result = {'Date': HISTORY_EPOCH + (weeks[starts] * 7 - 3).astype('timedelta64[D]')}
+        for metric in self.metrics:
+            values = np.asarray(self._column(person, metric, 'float32', n)[lo:hi], dtype='float64')
+            valid = ~np.isnan(values)
+            total = np.add.reduceat(np.where(valid, values, 0.0), starts)
+            count = np.add.reduceat(valid.astype('int64'), starts)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                result[metric] = np.where(count > 0, total / count, np.nan)
+        return pd.DataFrame(result)
+
+
+def seed_history(history, people, days=3 * 365, seed=42):
+    """Fill the store with synthetic daily weight and steps so the trend chart has something to show"""
+    rng = np.random.default_rng(seed)
+    end = np.datetime64('today', 'D')
+    for person in people:
+        dates = np.arange(end - np.timedelta64(days - 1, 'D'), end + np.timedelta64(1, 'D'))
+        recorded = rng.random(days) > 0.1  # Roughly one missed day in ten
+        weight = rng.uniform(55, 95) + np.cumsum(rng.normal(0, 0.1, days))
+        steps = np.clip(rng.normal(rng.uniform(5000, 10000), 1500, days), 0, None).round()
+        history.append(person, dates[recorded], {'Weight': weight[recorded], 'Steps': steps[recorded]})
+
+
+@st.cache_resource
+def metric_history(root):
+    """History store for the process, seeded with synthetic people the first time it's empty (if HISTORY_SEED)"""
+    history = MetricHistory(root)
+    if HISTORY_SEED and not history.people():
+        seed_history(history, [f"Person_{i}" for i in range(1, 11)])
+    return history
+
+
+# ---------- Report Images ----------
+REPORT_DISPLAY_SIZE = (1600, 1600)
+REPORT_THUMBNAIL_SIZE = (320, 320)
+REPORT_IMAGE_CACHE_BYTES = 128 * 1024 * 1024
+REPORT_IMAGE_WORKERS = min(4, os.cpu_count() or 1)
+REPORT_IMAGE_WAIT = 0.25  # Seconds a rerun waits for a small image before showing a placeholder instead
+REPORT_IMAGE_FAILURES = 64  # Uploads remembered as unreadable, so polling doesn't retry them forever
+
+
+def _encode_jpeg(img, quality):
+    buffer = io.BytesIO()
+    # No exif= argument, so the phone's EXIF block (location included) is dropped
+    img.save(buffer, format='JPEG', quality=quality, optimize=True)
+    return buffer.getvalue()
+
+
+def preprocess_report(data):
+    """Decode, orient and downsample a report image into display-size and thumbnail JPEGs"""
+    Image = lazy_import('PIL.Image')
+    ImageOps = lazy_import('PIL.ImageOps')
+    with Image.open(io.BytesIO(data)) as img:
+        img.draft('RGB', REPORT_DISPLAY_SIZE)  # JPEGs decode straight at a reduced scale
+        img = ImageOps.exif_transpose(img)
+    if img.mode in ('RGBA', 'LA', 'P'):
+        # Flatten transparency onto white rather than letting JPEG turn it black
+        img = img.convert('RGBA')
+        background = Image.new('RGB', img.size, 'white')
+        background.paste(img, mask=img.getchannel('A'))
+        img = background
+    else:
+        img = img.convert('RGB')
+    img.thumbnail(REPORT_DISPLAY_SIZE)
+    display = _encode_jpeg(img, 85)
+    img.thumbnail(REPORT_THUMBNAIL_SIZE)
+    return display, _encode_jpeg(img, 80)
+
+
+class ReportImageStore:
+    """Preprocesses uploads on a thread pool, deduplicated and cached by content hash"""
+
+    def __init__(self, workers=REPORT_IMAGE_WORKERS, max_bytes=REPORT_IMAGE_CACHE_BYTES,
+                 max_failures=REPORT_IMAGE_FAILURES):
+        self._pool = ThreadPoolExecutor(workers, thread_name_prefix="healthbot-images")
+        self._cache = FigureCache(max_bytes)  # Same byte-bounded LRU as the chart PNGs
+        self._pending = {}
+        self._failed = OrderedDict()
+        self.max_failures = max_failures
+        self._lock = threading.Lock()
+
+    def submit(self, digest, data):
+        """Future for (display, thumbnail); concurrent uploads of the same image share one job"""
+        with self._lock:
+            future = self._pending.get(digest) or self._failed.get(digest)
+            if future is not None:
+                return future
+            future = self._pool.submit(preprocess_report, data)
+            self._pending[digest] = future
+        future.add_done_callback(lambda done: self._finish(digest, done))
+        return future
+
+    def _finish(self, digest, future):
+        if future.exception() is None:
+            display, thumbnail = future.result()
+            self._cache.put((digest, 'display'), display)
+            self._cache.put((digest, 'thumbnail'), thumbnail)
+        with self._lock:
+            self._pending.pop(digest, None)
+            if future.exception() is not None:
+                self._failed[digest] = future
+                while len(self._failed) > self.max_failures:
+                    self._failed.popitem(last=False)
+
+    def get(self, digest, data, timeout=REPORT_IMAGE_WAIT):
+        """(display, thumbnail), or None while a large image is still being prepared
+
+        Raises whatever decoding the image raised
+        """
+        display = self._cache.get((digest, 'display'))
+        thumbnail = self._cache.get((digest, 'thumbnail'))
+        if display is not None and thumbnail is not None:
+            return display, thumbnail
+        future = self.submit(digest, data)
+        done, _ = wait([future], timeout=timeout)
+        return future.result() if done else None
+
+    def is_pending(self, digest):
+        with self._lock:
+            return digest in self._pending
+
+    def stats(self):
+        with self._lock:
+            pending, failed = len(self._pending), len(self._failed)
+        return {**self._cache.stats(), 'pending': pending, 'failed': failed}
+
+
+@st.cache_resource
+def report_image_store():
+    """One preprocessing pool and image cache per process"""
+    return ReportImageStore()
+
+
+def report_images(uploaded_file):
+    """Digest of an upload and its (display, thumbnail) renditions, None while they're being prepared
+
+    The bytes are only hashed once per session
+    """
+    digests = st.session_state.setdefault('report_digests', {})
+    data = uploaded_file.getvalue()
+    digest = digests.get(uploaded_file.file_id)
+    if digest is None:
+        digest = digests[uploaded_file.file_id] = hashlib.sha256(data).hexdigest()
+    return digest, report_image_store().get(digest, data)
+
+
+@st.fragment(run_every=0.5)
+def wait_for_report_images(digest):
+    """Poll the preprocessing pool without blocking the page, rerunning the app once the images are ready"""
+    if not report_image_store().is_pending(digest):
+        st.rerun()
+
+
+# ---------- Report Reading ----------
+# Optional: needs the Tesseract binary and pytesseract; the page falls back to manual selection without them
+OCR_WORKERS = min(2, os.cpu_count() or 1)
+OCR_RESULT_ENTRIES = 256
+# The value can't be glued to a letter, or "A1c" would read as 1; the unit is the token after it, on the same line
+NUMBER = r"[^\d\n]{0,30}?(?<![a-z])(\d+(?:\.\d+)?)(?:[ \t]*([%a-zµμ][a-z0-9µμ/%²]*))?"
+
+# (test, label pattern, low, high, condition flagged when the value falls outside [low, high],
+#  units the value may be reported in with their factor to the first one, which the range is in)
+LAB_RULES = [
+    ("Glucose", r"glucose", None, 125, "Diabetes", {"mg/dL": 1, "mmol/L": 18.016}),
+    ("HbA1c", r"hba1c|\ba1c\b", None, 6.4, "Diabetes", {"%": 1}),
+    ("LDL", r"\bldl\b", None, 159, "High Cholesterol", {"mg/dL": 1, "mmol/L": 38.67}),
+    ("Total Cholesterol", r"total cholesterol|cholesterol,? total", None, 239, "High Cholesterol",
+     {"mg/dL": 1, "mmol/L": 38.67}),
+    ("Hemoglobin", r"ha?emoglobin|\bhgb\b|\bhb\b(?!\s*a1c)", 12.0, None, "Anemia", {"g/dL": 1, "g/L": 0.1}),
+    ("TSH", r"\btsh\b", 0.4, 4.5, "Thyroid Issues", {"mIU/L": 1, "µIU/mL": 1, "mU/L": 1}),
+    ("Creatinine", r"creatinine", None, 1.3, "Kidney Issues", {"mg/dL": 1, "µmol/L": 1 / 88.4}),
+    ("ALT", r"\balt\b|\bsgpt\b", None, 56, "Liver Issues", {"U/L": 1, "IU/L": 1}),
+    ("AST", r"\bast\b|\bsgot\b", None, 40, "Liver Issues", {"U/L": 1, "IU/L": 1}),
+    ("Troponin", r"troponin", None, 0.04, "Heart Disease", {"ng/mL": 1, "µg/L": 1, "ng/L": 0.001}),
+    ("BMI", r"\bbmi\b", None, 29.9, "Obesity", {"kg/m²": 1})
+]
+
+
+def unit_key(unit):
+    """Case- and spelling-insensitive form of a unit, so "umol/l" and "µmol/L" match"""
+    return unit.lower().replace('μ', 'u').replace('µ', 'u').replace('²', '2')
+
+
+LAB_PATTERNS = [(test, re.compile(f"(?:{label}){NUMBER}", re.IGNORECASE), low, high, condition,
+                 {unit_key(unit): (unit, factor) for unit, factor in units.items()})
+                for test, label, low, high, condition, units in LAB_RULES]
+BLOOD_PRESSURE_PATTERN = re.compile(r"(?:blood pressure|\bbp\b)[^\d\n]{0,30}?(\d{2,3})\s*/\s*(\d{2,3})", re.IGNORECASE)
+
+
+def extract_findings(text):
+    """Lab values in OCR text that fall outside their reference range"""
+    findings = []
+    for test, pattern, low, high, condition, units in LAB_PATTERNS:
+        match = pattern.search(text)
+        if match is None:
+            continue
+        reported, unit = match.group(1), match.group(2)
+        value = float(reported)
+        range_unit = next(iter(units.values()))[0]
+        shown = f"{value:g} {range_unit}"
+        # Only a token with a slash or percent sign is a unit; a value without one is taken to be in range_unit
+        if unit is not None and ('/' in unit or '%' in unit):
+            if unit_key(unit) not in units:
+                continue  # Can't be compared with the range, so don't guess
+            unit, factor = units[unit_key(unit)]
+            if factor != 1:
+                value *= factor
+                shown = f"{value:.4g} {range_unit} ({reported} {unit})"
+        if (low is not None and value < low) or (high is not None and value > high):
+            if low is None:
+                reference = f"≤ {high:g} {range_unit}"
+            elif high is None:
+                reference = f"≥ {low:g} {range_unit}"
+            else:
+                reference = f"{low:g}–{high:g} {range_unit}"
+            findings.append({'Test': test, 'Value': shown, 'Reference': reference, 'Condition': condition})
+    match = BLOOD_PRESSURE_PATTERN.search(text)
+    if match is not None:
+        systolic, diastolic = int(match.group(1)), int(match.group(2))
+        if systolic >= 140 or diastolic >= 90:
+            findings.append({'Test': "Blood Pressure", 'Value': f"{systolic}/{diastolic}",
+                             'Reference': "< 140/90", 'Condition': "High Blood Pressure"})
+    return findings
+
+
+class ReportReader:
+    """Queues OCR jobs on a thread pool and caches the extracted findings by image hash"""
+
+    def __init__(self, workers=OCR_WORKERS, max_entries=OCR_RESULT_ENTRIES):
+        # pytesseract runs the tesseract binary as a subprocess, so threads are enough. A process
+        # pool would re-run this whole script in every worker (it is __main__ under Streamlit)
+        self._pool = ThreadPoolExecutor(workers, thread_name_prefix="healthbot-ocr")
+        self._ocr = lazy_import('pytesseract').image_to_string
+        self.max_entries = max_entries
+        self._results = OrderedDict()
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def submit(self, digest, image_bytes):
+        """Findings for an image, or None while its OCR job is still queued or running"""
+        with self._lock:
+            if digest in self._results:
+                self._results.move_to_end(digest)
+                return self._results[digest]
+            if digest in self._pending:
+                return None
+            image = lazy_import('PIL.Image').open(io.BytesIO(image_bytes)).convert('L')
+            future = self._pool.submit(self._ocr, image)
+            self._pending[digest] = future
+        future.add_done_callback(lambda done: self._finish(digest, done))
+        return None
+
+    def _finish(self, digest, future):
+        error = future.exception()
+        result = {'findings': [] if error else extract_findings(future.result()),
+                  'error': str(error) if error else None}
+        with self._lock:
+            self._pending.pop(digest, None)
+            self._results[digest] = result
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+
+    def is_pending(self, digest):
+        with self._lock:
+            return digest in self._pending
+
+    def stats(self):
+        with self._lock:
+            return {'queued_or_running': len(self._pending), 'cached_results': len(self._results)}
+
+
+@st.cache_resource
+def report_reader():
+    """One OCR queue per process, or None when Tesseract isn't installed"""
+    if shutil.which("tesseract") is None or importlib.util.find_spec("pytesseract") is None:
+        return None
+    return ReportReader()
+
+
+@st.fragment(run_every=1)
+def wait_for_report(digest):
+    """Poll the OCR queue without blocking the page, rerunning the app once the report is read"""
+    if not report_reader().is_pending(digest):
+        st.rerun()
+
+
+# ---------- Precompute Scheduler ----------
+PRECOMPUTE = os.environ.get("HEALTHBOT_PRECOMPUTE", "1") == "1"
+PRECOMPUTE_INTERVAL = float(os.environ.get("HEALTHBOT_PRECOMPUTE_INTERVAL", "5"))  # Seconds between stat() calls
+PRECOMPUTE_HISTORY = 20
+
+
+def precompute_tasks(path, signature):
+    """The heavy artifacts for one data version, in the order the pages need them"""
+    rules_signature = data_signature(RULES_PATH)
+
+    def histograms():
+        for metric in load_dataset(path, signature).numeric_columns():
+            distribution_summary(path, signature, metric, None)
+
+    # The Visualizations page opens on a browser-rendered bar chart of 20 rows, which needs
+    # nothing beyond the dataset and summaries
+    # Arguments match the pages' calls exactly, since the cache keys on what was passed
+    return [
+        ("dataset", lambda: filtered_data(path, signature, None)),
+        ("summaries", lambda: load_summaries(path, signature, None)),
+        ("filter indexes", lambda: (column_index(path, signature, 'Age'), bmi_category_index(path, signature))),
+        ("correlations", lambda: load_correlations(path, signature, None)),
+        ("histograms", histograms),
+        ("cohort screening", lambda: cohort_screening(path, signature, rules_signature)),
+        ("heart disease chart", lambda: heart_pie_chart(path, signature, rules_signature)),
+    ]
+
+
+def evict_version(path, signature):
+    """Drop the shared artifacts of a data version that is no longer served"""
+    for column in load_dataset(path, signature).numeric_columns():
+        column_index.clear(path, signature, column)
+    bmi_category_index.clear(path, signature)
+    for cached in (filtered_data, load_summaries, load_correlations):
+        cached.clear(path, signature, None)
+    # Entries for earlier rules versions are bounded by max_entries instead
+    rules_signature = data_signature(RULES_PATH)
+    for cached in (cohort_screening, heart_pie_chart):
+        cached.clear(path, signature, rules_signature)
+    batch_bmi_from_dataset.clear(path, signature)
+    load_dataset.clear(path, signature)
+    for export in CACHE_DIR.glob(f"{path.stem}-{signature}-*.csv"):
+        export.unlink(missing_ok=True)
+
+
+class _QuietPrecomputeThread(logging.Filter):
+    """Drops Streamlit's missing-ScriptRunContext warning for the precompute thread"""
+
+    def filter(self, record):
+        return threading.current_thread().name != "healthbot-precompute"
+
+
+class PrecomputeScheduler:
+    """Watches the data file and builds every heavy artifact for a new version before publishing it
+
+    Sessions keep reading the published version until the next one is complete, so a data
+    change never lands a cold computation in someone's rerun
+    """
+
+    def __init__(self, path, interval):
+        self.path = path
+        self.interval = interval
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.latest = object()  # Newest signature seen; never equal to a real one at first
+        self.published = []     # Published versions, oldest first
+        self.remaining = 0
+        self.refreshes = []
+
+    def start(self):
+        # Deliberately no ScriptRunContext: cache misses would otherwise draw spinners into a random session
+        logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").addFilter(
+            _QuietPrecomputeThread())
+        for target, name in ((self._watch, "healthbot-watch"), (self._work, "healthbot-precompute")):
+            threading.Thread(target=target, name=name, daemon=True).start()
+
+    def version(self):
+        """The newest fully precomputed version, or the file's current one before the first refresh finishes"""
+        with self.lock:
+            if self.published:
+                return self.published[-1]
+        return data_signature(self.path)
+
+    def check(self):
+        signature = data_signature(self.path)
+        with self.lock:
+            if signature == self.latest:
+                return
+            self.latest = signature
+        self.queue.put(signature)
+
+    def _watch(self):
+        while True:
+            self.check()
+            time.sleep(self.interval)
+
+    def _work(self):
+        while True:
+            signature = self.queue.get()
+            # A file that changed again while queued is only built in its newest version
+            if signature == self.latest:
+                self.refresh(signature)
+
+    def refresh(self, signature):
+        tasks = precompute_tasks(self.path, signature)
+        with self.lock:
+            self.remaining = len(tasks)
+        record = {'version': signature, 'started': time.time(), 'tasks': {}, 'error': None}
+        start = time.perf_counter()
+        for name, task in tasks:
+            task_start = time.perf_counter()
+            try:
+                task()
+            except Exception as e:
+                record['error'] = f"{name}: {e}"
+                break
+            finally:
+                record['tasks'][name] = time.perf_counter() - task_start
+                with self.lock:
+                    self.remaining -= 1
+        record['seconds'] = time.perf_counter() - start
+
+        retired = None
+        with self.lock:
+            self.remaining = 0
+            self.refreshes.append(record)
+            del self.refreshes[:-PRECOMPUTE_HISTORY]
+            if record['error'] is None:
+                # The swap: every rerun starting after this line reads the new version
+                self.published.append(signature)
+                # The previous version stays cached for reruns that started before the swap
+                if len(self.published) > 2:
+                    retired = self.published.pop(0)
+        if retired is not None and retired not in self.published:
+            evict_version(self.path, retired)
+
+    def stats(self):
+        with self.lock:
+            last = self.refreshes[-1] if self.refreshes else None
+            return {
+                'published_version': self.published[-1] if self.published else None,
+                'queue_depth': self.queue.qsize(),
+                'tasks_remaining': self.remaining,
+                'refreshes': len(self.refreshes),
+                'last_refresh': dict(last, tasks=dict(last['tasks'])) if last else None
+            }
+
+
+@st.cache_resource
+def precompute_scheduler():
+    """The process-wide scheduler, started on first use"""
+    scheduler = PrecomputeScheduler(DATA_PATH, PRECOMPUTE_INTERVAL)
+    scheduler.start()
+    return scheduler
+
+
+# Only a stat() call (or a lookup of the last precomputed version); pages that need the data load it themselves
+data_version = precompute_scheduler().version() if PRECOMPUTE else data_signature(DATA_PATH)
 
 # ---------- Sidebar ----------
 st.sidebar.markdown("### 🏥 HealthBot Menu")
-option = st.sidebar.radio("Navigate to:", [
+pages = [
     "🏠 Home",
     "🧮 BMI Calculator",
     "📊 Visualizations",
     "🧾 Check Your Health"
-])
+]
+# The admin page is only listed when the URL carries ?admin=1
+if st.query_params.get("admin") == "1":
+    pages.append("🛠️ Admin")
+option = st.sidebar.radio("Navigate to:", pages)
 
 # ------------------- HOME PAGE -------------------
 if option == "🏠 Home":
@@ -185,228 +2228,300 @@ if option == "🏠 Home":
     # ---------- Sample Health Insights ----------
     st.markdown("### Sample Health Insights")
 
+    rules_version = data_signature(RULES_PATH)
     col1, col2 = st.columns(2)
     
-    with col1:
-        # BMI Pie Chart
-        bmi_data = pd.DataFrame({
-            "BMI Category": ["Underweight", "Normal", "Overweight", "Obese"],
-            "Count": [50, 400, 300, 125]
-        })
-        fig_bmi = px.pie(bmi_data, names="BMI Category", values="Count",
-                         title="BMI Distribution", color_discrete_sequence=px.colors.sequential.Pinkyl)
-        st.plotly_chart(fig_bmi, use_container_width=True)
-
-    with col2:
-        # Heart Disease Pie Chart
-        heart_data = pd.DataFrame({
-            "Heart Disease": ["Yes", "No"],
-            "Count": [120, 1080]
-        })
-        fig_heart = px.pie(heart_data, names="Heart Disease", values="Count",
-                           title="Heart Disease Prevalence", color_discrete_sequence=px.colors.sequential.Teal)
-        st.plotly_chart(fig_heart, use_container_width=True)
-
-    # Sample Line Chart
-    st.markdown("### Sample Health Trends")
-    fig, ax = plt.subplots(figsize=(10,4))
-    days = np.arange(1, 8)
-    weight = [65, 64.8, 64.5, 64.3, 64.0, 63.8, 63.7]
-    steps = [7000, 7500, 8000, 6500, 9000, 8500, 8000]
+    with col1, span("st.plotly_chart"):
+        st.plotly_chart(bmi_pie_chart(), use_container_width=True)
 
-    ax.plot(days, weight, marker='o', label="Weight (kg)", color="#ff4081", linewidth=2)
-    ax2 = ax.twinx()
-    ax2.plot(days, steps, marker='s', label="Steps per Day", color="#0288d1", linewidth=2)
-    
-    ax.set_xticks(days)
-    ax.set_xlabel("Day", fontsize=12)
-    ax.set_ylabel("Weight (kg)", fontsize=12, color="#ff4081")
-    ax2.set_ylabel("Steps per Day", fontsize=12, color="#0288d1")
-    ax.set_title("Sample Health Trends", fontsize=14)
-    ax.legend(loc='upper left')
-    ax2.legend(loc='upper right')
-    ax.grid(True, alpha=0.3)
-    plt.tight_layout()
-    st.pyplot(fig)
-    plt.close()
+    with col2, span("st.plotly_chart"):
+        try:
+            heart_chart = heart_pie_chart(DATA_PATH, data_version, rules_version)
+            if heart_chart is None:
+                st.info("This dataset doesn't include enough risk factors to estimate heart disease risk.")
+            else:
+                st.plotly_chart(heart_chart, use_container_width=True)
+        except Exception as e:
+            st.error(f"Error loading data: {e}")
+
+    # ---------- Cohort Risk Screening ----------
+    st.markdown("### Cohort Risk Screening")
+    try:
+        with span("cohort_screening"):
+            flags, prevalence = cohort_screening(DATA_PATH, data_version, rules_version)
+    except Exception as e:
+        st.error(f"Error loading data: {e}")
+    else:
+        st.markdown(f"Share of the {len(flags):,} people in the dataset flagged by the screening rules.")
+        for col, (condition, share) in zip(st.columns(max(len(prevalence), 1)), prevalence.items()):
+            col.metric(condition, f"{share:.1%}")
+        if st.button("Prepare screening results for download", use_container_width=True):
+            with st.spinner("Writing screening results..."):
+                export = screening_export(DATA_PATH, data_version, rules_version)
+            with open(export, 'rb') as f:
+                st.download_button("Download screening results as CSV", f, file_name="screening_results.csv",
+                                   mime="text/csv", use_container_width=True)
+
+    # Health Trends
+    st.markdown("### Health Trends")
+    try:
+        history = metric_history(HISTORY_DIR)
+        people = history.people()
+    except OSError:
+        people = []  # Read-only deployments just go without trends, like the Arrow copy
+    if people:
+        col1, col2 = st.columns(2)
+        person = col1.selectbox("Person", people)
+        period = col2.select_slider("Period", list(HISTORY_PERIODS), value="3 months")
+        end = history.last_day(person)
+        start = end - np.timedelta64(HISTORY_PERIODS[period] - 1, 'D') if HISTORY_PERIODS[period] else None
+        # Long periods switch to weekly means so the chart stays readable and cheap
+        if HISTORY_PERIODS[period] and HISTORY_PERIODS[period] <= 120:
+            resolution = "7-day rolling mean"
+            trends = history.query(person, start, end, window=7)
+            trends = trends[['Date']].assign(Weight=trends['Weight (7d avg)'], Steps=trends['Steps (7d avg)'])
+        else:
+            resolution = "weekly"
+            trends = history.weekly(person, start, end)
+        render_figure(("Home", "Health Trends", person, period, history.length(person)),
+                      lambda: draw_health_trends(person, trends, resolution))
+    else:
+        st.caption("No metric history recorded yet.")
 
     # Sample Bar Chart
     st.markdown("### Sample Average Health Metrics")
-    health_metrics = ['BMI', 'Heart Rate', 'Blood Pressure', 'Cholesterol']
-    avg_values = [22.5, 72, 120, 180]
-    colors = ['#ff4081', '#0288d1', '#ff80ab', '#81d4fa']
-
-    fig2, ax2 = plt.subplots(figsize=(8,5))
-    bars = ax2.bar(health_metrics, avg_values, color=colors, alpha=0.8)
-    ax2.set_ylabel("Average Value", fontsize=12)
-    ax2.set_title("Sample Average Health Metrics", fontsize=14)
-    ax2.grid(axis='y', alpha=0.3)
-    
-    # Add value labels on bars
-    for bar in bars:
-        height = bar.get_height()
-        ax2.text(bar.get_x() + bar.get_width()/2., height,
-                f'{height:.1f}',
-                ha='center', va='bottom', fontsize=10)
-    
-    plt.tight_layout()
-    st.pyplot(fig2)
-    plt.close()
+    render_figure(("Home", "Sample Average Health Metrics"), draw_sample_averages)
 
 # ------------------- BMI CALCULATOR -------------------
 elif option == "🧮 BMI Calculator":
     st.header("🧮 BMI Calculator")
     st.markdown("Calculate your Body Mass Index (BMI) to understand your weight category.")
     
-    col1, col2 = st.columns(2)
-    height = col1.number_input("Height (meters)", min_value=1.0, max_value=2.5, value=1.65, step=0.01)
-    weight = col2.number_input("Weight (kg)", min_value=30.0, max_value=200.0, value=65.0, step=0.5)
+    mode = st.radio("Mode", ["Single Person", "Batch"], horizontal=True)
 
-    if st.button("Calculate BMI", use_container_width=True):
-        bmi = weight / (height ** 2)
-        st.markdown("---")
-        st.subheader(f"Your BMI: {bmi:.2f}")
-        
-        if bmi < 18.5:
-            st.warning("⚠️ Category: Underweight")
-            st.info("💡 **Suggestion:** Consider consulting a nutritionist to develop a healthy weight gain plan.")
-        elif bmi < 24.9:
-            st.success("✅ Category: Normal weight")
-            st.info("💡 **Suggestion:** Great! Maintain your current lifestyle with balanced diet and regular exercise.")
-        elif bmi < 29.9:
-            st.warning("⚠️ Category: Overweight")
-            st.info("💡 **Suggestion:** Consider increasing physical activity and consulting a nutritionist for dietary advice.")
-        else:
-            st.error("🚨 Category: Obese")
-            st.info("💡 **Suggestion:** It's recommended to consult with a healthcare provider for a comprehensive health plan.")
-        
-        # BMI Scale visualization
-        st.markdown("### BMI Scale Reference")
-        bmi_categories = ['Underweight', 'Normal', 'Overweight', 'Obese']
-        bmi_ranges = ['< 18.5', '18.5 - 24.9', '25 - 29.9', '≥ 30']
-        bmi_colors = ['#FFD700', '#4CAF50', '#FFA500', '#F44336']
-        
-        fig, ax = plt.subplots(figsize=(10, 2))
-        for i, (cat, rng, color) in enumerate(zip(bmi_categories, bmi_ranges, bmi_colors)):
-            ax.barh(0, 1, left=i, color=color, alpha=0.7, edgecolor='black')
-            ax.text(i + 0.5, 0, f'{cat}\n{rng}', ha='center', va='center', fontsize=10, fontweight='bold')
-        
-        # Mark user's BMI
-        if bmi < 18.5:
-            position = 0.5
-        elif bmi < 24.9:
-            position = 1 + (bmi - 18.5) / (24.9 - 18.5)
-        elif bmi < 29.9:
-            position = 2 + (bmi - 25) / (29.9 - 25)
+    if mode == "Single Person":
+        col1, col2 = st.columns(2)
+        height = col1.number_input("Height (meters)", min_value=1.0, max_value=2.5, value=1.65, step=0.01)
+        weight = col2.number_input("Weight (kg)", min_value=30.0, max_value=200.0, value=65.0, step=0.5)
+
+        if st.button("Calculate BMI", use_container_width=True):
+            result = bmi_table([height], [weight]).iloc[0]
+            bmi = result['BMI']
+            st.markdown("---")
+            st.subheader(f"Your BMI: {bmi:.2f}")
+            
+            msg_type, msg, suggestion = BMI_ADVICE[result['Category']]
+            getattr(st, msg_type)(msg)
+            st.info(f"💡 **Suggestion:** {suggestion}")
+            
+            # BMI Scale visualization
+            st.markdown("### BMI Scale Reference")
+            plt = pyplot()
+            fig, ax = plt.subplots(figsize=(10, 2))
+            for i, (cat, rng, color) in enumerate(zip(BMI_CATEGORIES, BMI_RANGES, BMI_COLORS)):
+                ax.barh(0, 1, left=i, color=color, alpha=0.7, edgecolor='black')
+                ax.text(i + 0.5, 0, f'{cat}\n{rng}', ha='center', va='center', fontsize=10, fontweight='bold')
+            
+            # Mark user's BMI
+            ax.plot(result['Scale_Position'], 0, 'v', color='red', markersize=15, label=f'Your BMI: {bmi:.1f}')
+            ax.set_xlim(0, 4)
+            ax.set_ylim(-0.5, 0.5)
+            ax.axis('off')
+            ax.legend(loc='upper right')
+            with span("figure.tight_layout"):
+                plt.tight_layout()
+            with span("st.pyplot"):
+                st.pyplot(fig)
+            plt.close()
+
+    else:
+        st.markdown("Upload a CSV with **Height** (m) and **Weight** (kg) columns, "
+                    "or run the calculator over the loaded dataset.")
+        source = st.selectbox("Data source", ["Upload CSV", "Loaded dataset"])
+
+        batch = None
+        if source == "Upload CSV":
+            uploaded_csv = st.file_uploader("Upload heights and weights", type=["csv"])
+            if uploaded_csv is not None:
+                try:
+                    batch = batch_bmi_from_csv(uploaded_csv.getvalue())
+                except ValueError as e:
+                    st.error(f"Could not read the CSV: {e}")
         else:
-            position = 3.5
-        
-        ax.plot(position, 0, 'v', color='red', markersize=15, label=f'Your BMI: {bmi:.1f}')
-        ax.set_xlim(0, 4)
-        ax.set_ylim(-0.5, 0.5)
-        ax.axis('off')
-        ax.legend(loc='upper right')
-        plt.tight_layout()
-        st.pyplot(fig)
-        plt.close()
+            batch = batch_bmi_from_dataset(DATA_PATH, data_version)
+
+        if batch is not None:
+            table, counts, dropped = batch
+            if dropped:
+                st.warning(f"Skipped {dropped:,} rows with a height or weight that isn't positive.")
+            st.markdown("### Category Counts")
+            for col, (category, count) in zip(st.columns(len(counts)), counts.items()):
+                col.metric(category, f"{count:,}")
+
+            st.markdown(f"### Results ({len(table):,} rows)")
+            st.dataframe(table.head(1000), use_container_width=True)
+            # The CSV is only built on request; for the dataset it is streamed to disk like the screening export
+            if st.button("Prepare results for download", use_container_width=True):
+                with st.spinner("Writing BMI results..."):
+                    if source == "Upload CSV":
+                        results = io.BytesIO(table.to_csv(index=False).encode())
+                    else:
+                        results = open(batch_bmi_export(DATA_PATH, data_version), 'rb')
+                with results as f:
+                    st.download_button("Download results as CSV", f,
+                                       file_name="bmi_results.csv", mime="text/csv", use_container_width=True)
 
 # ------------------- VISUALIZATIONS -------------------
 elif option == "📊 Visualizations":
     st.header("📊 Health Data Visualizations")
     st.markdown("Explore various health metrics through interactive visualizations.")
     
+    # Load data
+    try:
+        with span("load_data"):
+            dataset = load_dataset(DATA_PATH, data_version)
+        numeric_columns = dataset.numeric_columns()
+        
+        # Filters resolve against bitmap indexes; only ranges narrower than the full column count
+        st.sidebar.markdown("### Filters")
+        ranges = []
+        filter_columns = ['Age'] + st.sidebar.multiselect(
+            "Metric thresholds", [col for col in numeric_columns if col != 'Age'])
+        for col in filter_columns:
+            index = column_index(DATA_PATH, data_version, col)
+            options = index.options.tolist()
+            low, high = st.sidebar.select_slider(f"{col} range", options, value=(options[0], options[-1]),
+                                                 format_func=index.label)
+            if (low, high) != (options[0], options[-1]):
+                ranges.append((col, low, high))
+        categories = BMI_CATEGORIES
+        if 'BMI' in dataset.frame:
+            categories = st.sidebar.multiselect("BMI category", BMI_CATEGORIES, default=BMI_CATEGORIES)
+        predicate = filter_predicate(ranges, categories)
+        
+        with span("filter_rows"):
+            df = filtered_data(DATA_PATH, data_version, predicate)
+        if len(df):
+            with span("load_summaries"):
+                summaries = load_summaries(DATA_PATH, data_version, predicate)
+    except Exception as e:
+        st.error(f"Error loading data: {e}")
+        st.stop()
+    
+    if predicate is not None:
+        st.caption(f"Showing {len(df):,} of {len(dataset.frame):,} rows matching the filters.")
+    if not len(df):
+        st.warning("No rows match the filters.")
+        st.stop()
+    
+    backend = st.sidebar.radio("Chart rendering", CHART_BACKENDS,
+                               help="Browser charts are drawn by your browser from pre-aggregated data; "
+                                    "server charts are rendered as images.")
+    
     chart_type = st.selectbox("Select Visualization Type", 
                               ["Bar Chart", "Line Chart", "Correlation Heatmap", "Distribution Plot"])
     
     if chart_type == "Bar Chart":
         metric = st.selectbox("Choose Metric", numeric_columns)
-        st.markdown(f"### {metric} by Person")
-        
-        # Show only first 20 for readability
-        df_subset = df.head(20)
+        group_by = st.radio("Group by", ["Person (first 20)", "Age Group"], horizontal=True)
         
-        fig, ax = plt.subplots(figsize=(12,6))
-        bars = ax.bar(range(len(df_subset)), df_subset[metric], color='#0288d1', alpha=0.7)
-        ax.set_xlabel("Person Index", fontsize=12)
-        ax.set_ylabel(metric, fontsize=12)
-        ax.set_title(f"{metric} Distribution (First 20 People)", fontsize=14)
-        ax.grid(axis='y', alpha=0.3)
-        plt.tight_layout()
-        st.pyplot(fig)
-        plt.close()
+        if group_by == "Age Group":
+            bin_width = st.slider("Age bin width (years)", 1, 10, 5)
+            st.markdown(f"### Average {metric} by Age Group")
+            
+            def build():
+                profile = age_profile(DATA_PATH, data_version, metric, bin_width, predicate)
+                labels = [f"{int(age)}-{int(age) + bin_width - 1}" if bin_width > 1 else f"{int(age)}"
+                          for age in profile.index]
+                chart = Chart()
+                panel = chart.panel(f"Average {metric} by Age Group", xlabel="Age Group",
+                                    ylabel=f"Average {metric}", grid='y', rotate_xticks=True)
+                panel.bar(labels, profile['mean'].to_numpy(), color='#0288d1')
+                return chart
+            
+            show_chart((chart_type, metric, bin_width, data_version, predicate), build, backend)
+        else:
+            st.markdown(f"### {metric} by Person")
+            
+            show_chart((chart_type, metric, None, data_version, predicate), lambda: people_chart(df, metric), backend)
         
         # Statistics
         st.markdown("### Statistics")
-        col1, col2, col3, col4 = st.columns(4)
-        col1.metric("Mean", f"{df[metric].mean():.2f}")
-        col2.metric("Median", f"{df[metric].median():.2f}")
-        col3.metric("Min", f"{df[metric].min():.2f}")
-        col4.metric("Max", f"{df[metric].max():.2f}")
+        summary = summaries[metric]
+        col1, col2, col3, col4, col5 = st.columns(5)
+        col1.metric("Mean", f"{summary.mean:.2f}")
+        col2.metric("Median", f"{summary.quantile(0.5):.2f}")
+        col3.metric("P95", f"{summary.quantile(0.95):.2f}")
+        col4.metric("Min", f"{summary.min:.2f}")
+        col5.metric("Max", f"{summary.max:.2f}")
         
     elif chart_type == "Line Chart":
         metric = st.selectbox("Choose Metric", numeric_columns)
+        bin_width = st.slider("Age bin width (years)", 1, 10, 5)
         st.markdown(f"### {metric} Trend by Age")
         
-        # Sort by age for better visualization
-        df_sorted = df.sort_values('Age')
+        def build():
+            ages, values = age_trend_points(DATA_PATH, data_version, metric, predicate)
+            profile = age_profile(DATA_PATH, data_version, metric, bin_width, predicate)
+            centers = (profile.index + (bin_width - 1) / 2).to_numpy()
+            chart = Chart()
+            panel = chart.panel(f"{metric} vs Age", xlabel="Age", ylabel=metric, legend=True)
+            panel.line(ages, values, color='#ff4081', marker='o', alpha=0.7)
+            panel.band(centers, profile['p25'].to_numpy(), profile['p75'].to_numpy(), color='#0288d1',
+                       label="Interquartile range")
+            panel.line(centers, profile['mean'].to_numpy(), color='#0288d1', label="Mean per age group")
+            return chart
         
-        fig, ax = plt.subplots(figsize=(12,6))
-        ax.plot(df_sorted['Age'], df_sorted[metric], marker='o', linestyle='-', 
-                color='#ff4081', linewidth=2, markersize=6, alpha=0.7)
-        ax.set_xlabel("Age", fontsize=12)
-        ax.set_ylabel(metric, fontsize=12)
-        ax.set_title(f"{metric} vs Age", fontsize=14)
-        ax.grid(True, alpha=0.3)
-        plt.tight_layout()
-        st.pyplot(fig)
-        plt.close()
+        show_chart((chart_type, metric, bin_width, data_version, predicate), build, backend)
         
     elif chart_type == "Distribution Plot":
         metric = st.selectbox("Choose Metric", numeric_columns)
         st.markdown(f"### {metric} Distribution")
         
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14,5))
-        
-        # Histogram
-        ax1.hist(df[metric], bins=20, color='#0288d1', alpha=0.7, edgecolor='black')
-        ax1.set_xlabel(metric, fontsize=12)
-        ax1.set_ylabel("Frequency", fontsize=12)
-        ax1.set_title(f"{metric} Histogram", fontsize=14)
-        ax1.grid(axis='y', alpha=0.3)
+        def build():
+            summary = distribution_summary(DATA_PATH, data_version, metric, predicate)
+            chart = Chart(figsize=(14, 5))
+            histogram = chart.panel(f"{metric} Histogram", xlabel=metric, ylabel="Frequency", grid='y')
+            histogram.histogram(summary['counts'], summary['edges'], color='#0288d1')
+            box = chart.panel(f"{metric} Box Plot", ylabel=metric, grid='y')
+            box.box(summary['box'], color='#ff4081')
+            return chart
         
-        # Box plot
-        ax2.boxplot(df[metric], vert=True, patch_artist=True,
-                    boxprops=dict(facecolor='#ff4081', alpha=0.7),
-                    medianprops=dict(color='red', linewidth=2))
-        ax2.set_ylabel(metric, fontsize=12)
-        ax2.set_title(f"{metric} Box Plot", fontsize=14)
-        ax2.grid(axis='y', alpha=0.3)
-        
-        plt.tight_layout()
-        st.pyplot(fig)
-        plt.close()
+        show_chart((chart_type, metric, data_version, predicate), build, backend)
         
     else:  # Correlation Heatmap
         st.markdown("### Correlation Between Health Metrics")
-        st.markdown("This heatmap shows how different health metrics relate to each other.")
-        
-        fig, ax = plt.subplots(figsize=(10,8))
-        correlation_matrix = numeric_df.corr()
-        sns.heatmap(correlation_matrix, annot=True, cmap="coolwarm", 
-                   center=0, square=True, linewidths=1, 
-                   cbar_kws={"shrink": 0.8}, ax=ax, fmt='.2f')
-        ax.set_title("Health Metrics Correlation Matrix", fontsize=14, pad=20)
-        plt.tight_layout()
-        st.pyplot(fig)
-        plt.close()
+        correlation_matrix = load_correlations(DATA_PATH, data_version, predicate).matrix()
+        view = st.radio("View", ["Full Matrix", "Top Correlated Pairs"], horizontal=True)
         
-        st.markdown("""
-        **How to read this heatmap:**
-        - Values range from -1 to 1
-        - 1 (dark red) = strong positive correlation
-        - 0 (white) = no correlation
-        - -1 (dark blue) = strong negative correlation
-        """)
+        if view == "Full Matrix":
+            st.markdown("This heatmap shows how different health metrics relate to each other.")
+            wide = len(correlation_matrix) > HEATMAP_ANNOTATE_MAX
+            
+            def build():
+                matrix = correlation_matrix
+                if wide:
+                    # Too many cells to read individually, so group similar metrics together instead
+                    order = matrix.columns[correlation_order(matrix)]
+                    matrix = matrix.loc[order, order]
+                size = min(10 + len(matrix) // 10, 30)
+                chart = Chart(figsize=(size, size * 0.8))
+                chart.panel("Health Metrics Correlation Matrix", grid=None).heatmap(matrix, annotate=not wide)
+                return chart
+            
+            show_chart((chart_type, None, data_version, predicate), build, backend)
+            
+            st.markdown("""
+            **How to read this heatmap:**
+            - Values range from -1 to 1
+            - 1 (dark red) = strong positive correlation
+            - 0 (white) = no correlation
+            - -1 (dark blue) = strong negative correlation
+            """)
+        else:
+            pair_count = len(correlation_matrix) * (len(correlation_matrix) - 1) // 2
+            k = st.slider("Number of pairs", 1, max(pair_count, 1), min(10, max(pair_count, 1)))
+            st.dataframe(top_correlations(correlation_matrix, k), use_container_width=True, hide_index=True)
 
 # ------------------- HEALTH REPORT CHECKER -------------------
 elif option == "🧾 Check Your Health":
@@ -418,89 +2533,52 @@ elif option == "🧾 Check Your Health":
     uploaded_image = st.file_uploader("Upload your medical report image", type=["png", "jpg", "jpeg"])
     
     if uploaded_image is not None:
-        st.image(uploaded_image, caption="Uploaded Report", use_container_width=True)
+        try:
+            with span("report_images"):
+                report_digest, renditions = report_images(uploaded_image)
+        except (OSError, lazy_import('PIL.Image').DecompressionBombError) as e:
+            # Pillow refuses images over twice MAX_IMAGE_PIXELS before decoding them
+            st.error(f"Could not read the image: {e}")
+            st.stop()
+        if renditions is None:
+            # Large photos decode on the pool; this rerun ends here instead of waiting for them
+            st.info("🖼️ Preparing your report...")
+            wait_for_report_images(report_digest)
+            st.stop()
+        report_display, report_thumbnail = renditions
+        full_size = st.toggle("Show full-size report")
+        st.image(report_display if full_size else report_thumbnail, caption="Uploaded Report",
+                 use_container_width=full_size)
         st.info("⚠️ **Important:** This tool provides general wellness suggestions and is NOT a substitute for professional medical advice.")
         
         st.markdown("---")
-        issue = st.selectbox("Select the condition mentioned in your report (if known):", [
-            "None / Not Sure",
-            "High Blood Pressure",
-            "Diabetes",
-            "Anemia",
-            "High Cholesterol",
-            "Heart Disease",
-            "Obesity",
-            "Thyroid Issues",
-            "Kidney Issues",
-            "Liver Issues"
-        ])
+        detected = []
+        reader = report_reader()
+        if reader is None:
+            st.caption("ℹ️ Automatic report reading needs Tesseract OCR and pytesseract installed.")
+        else:
+            report = reader.submit(report_digest, report_display)
+            if report is None:
+                st.info("🔍 Reading your report... detected conditions will be pre-selected when it's done.")
+                wait_for_report(report_digest)
+            elif report['error']:
+                st.warning(f"⚠️ Could not read the report automatically: {report['error']}")
+            elif report['findings']:
+                st.markdown("### 🔍 Values Outside Reference Range")
+                st.dataframe(pd.DataFrame(report['findings']), use_container_width=True, hide_index=True)
+                detected = list(dict.fromkeys(finding['Condition'] for finding in report['findings']))
+            else:
+                st.caption("No out-of-range lab values were recognised in this report.")
+
+        rules = wellness_rules(RULES_PATH, data_signature(RULES_PATH))
+        issues = st.multiselect("Select the condition(s) mentioned in your report (if known):",
+                                rules.conditions, default=detected, placeholder="None / Not Sure")
         
         if st.button("Get Wellness Suggestions", use_container_width=True):
             st.markdown("---")
             st.markdown("### 📋 Wellness Suggestions")
             
-            suggestions = {
-                "High Blood Pressure": [
-                    ("⚠️", "warning", "Possible Hypertension detected."),
-                    ("👨‍⚕️", "info", "**Consult:** Cardiologist or general physician for proper diagnosis and treatment plan."),
-                    ("🥗", "success", "**Diet Tips:**\n- Reduce salt intake (< 5g per day)\n- Eat more fruits and vegetables\n- Include oats, bananas, and leafy greens\n- Avoid processed and fried foods"),
-                    ("🏃", "success", "**Lifestyle Tips:**\n- Daily walking (30 minutes)\n- Practice stress-reduction techniques\n- Maintain healthy weight\n- Avoid smoking and limit alcohol")
-                ],
-                "Diabetes": [
-                    ("⚠️", "warning", "Possible Diabetes condition."),
-                    ("👨‍⚕️", "info", "**Consult:** Endocrinologist for blood sugar monitoring and medication."),
-                    ("🥗", "success", "**Diet Tips:**\n- Choose low glycemic index foods\n- Include whole grains, legumes\n- Eat plenty of leafy vegetables\n- Avoid sugary drinks and desserts"),
-                    ("🏃", "success", "**Lifestyle Tips:**\n- Regular exercise (150 min/week)\n- Monitor blood sugar levels\n- Maintain healthy weight\n- Stay hydrated")
-                ],
-                "Anemia": [
-                    ("⚠️", "warning", "Possible Iron Deficiency (Anemia)."),
-                    ("👨‍⚕️", "info", "**Consult:** Doctor for complete blood count test and iron supplementation."),
-                    ("🥗", "success", "**Diet Tips:**\n- Iron-rich foods: spinach, beetroot, dates\n- Vitamin C foods for better absorption\n- Red meat, fish, and poultry\n- Fortified cereals and legumes"),
-                    ("🏃", "success", "**Lifestyle Tips:**\n- Avoid tea/coffee with meals\n- Cook in iron utensils\n- Get adequate rest")
-                ],
-                "High Cholesterol": [
-                    ("⚠️", "warning", "High cholesterol levels detected."),
-                    ("👨‍⚕️", "info", "**Consult:** Doctor for lipid profile review and possible statin therapy."),
-                    ("🥗", "success", "**Diet Tips:**\n- Eat oats, barley, and whole grains\n- Include nuts and fatty fish\n- Use olive oil instead of butter\n- Avoid trans fats and fried foods"),
-                    ("🏃", "success", "**Lifestyle Tips:**\n- Regular aerobic exercise\n- Maintain healthy weight\n- Quit smoking\n- Limit alcohol consumption")
-                ],
-                "Heart Disease": [
-                    ("⚠️", "warning", "Possible heart condition detected."),
-                    ("👨‍⚕️", "info", "**Consult:** Cardiologist immediately for comprehensive cardiac evaluation."),
-                    ("🥗", "success", "**Diet Tips:**\n- Low-fat, high-fiber diet\n- Plenty of fruits & vegetables\n- Omega-3 rich foods (fish, walnuts)\n- Limit sodium and saturated fats"),
-                    ("🏃", "success", "**Lifestyle Tips:**\n- Supervised cardio exercises\n- Stress management techniques\n- Avoid smoking & alcohol\n- Regular health monitoring")
-                ],
-                "Obesity": [
-                    ("⚠️", "warning", "Possible Obesity condition."),
-                    ("👨‍⚕️", "info", "**Consult:** Nutritionist or physician for personalized weight management plan."),
-                    ("🥗", "success", "**Diet Tips:**\n- Balanced low-calorie diet\n- Portion control\n- Reduce sugar & junk food\n- Increase protein and fiber intake"),
-                    ("🏃", "success", "**Lifestyle Tips:**\n- Daily physical activity (walking, swimming)\n- Aerobic and strength training\n- Set realistic weight loss goals\n- Track food intake and progress")
-                ],
-                "Thyroid Issues": [
-                    ("⚠️", "warning", "Possible Thyroid condition."),
-                    ("👨‍⚕️", "info", "**Consult:** Endocrinologist for thyroid function tests and hormone therapy."),
-                    ("🥗", "success", "**Diet Tips:**\n- Iodine-rich foods (seafood, dairy)\n- Selenium-rich foods (Brazil nuts)\n- Avoid processed foods\n- Include fruits & vegetables"),
-                    ("🏃", "success", "**Lifestyle Tips:**\n- Moderate exercise routine\n- Regular thyroid checkups\n- Stress management\n- Adequate sleep (7-8 hours)")
-                ],
-                "Kidney Issues": [
-                    ("⚠️", "warning", "Possible kidney condition."),
-                    ("👨‍⚕️", "info", "**Consult:** Nephrologist for kidney function tests and treatment plan."),
-                    ("🥗", "success", "**Diet Tips:**\n- Low-sodium diet\n- Controlled protein intake\n- Stay well-hydrated\n- Limit potassium and phosphorus\n- Fresh fruits & vegetables"),
-                    ("🏃", "success", "**Lifestyle Tips:**\n- Avoid dehydration\n- Regular health monitoring\n- Control blood pressure\n- Avoid NSAIDs without doctor's advice")
-                ],
-                "Liver Issues": [
-                    ("⚠️", "warning", "Possible liver condition."),
-                    ("👨‍⚕️", "info", "**Consult:** Hepatologist for liver function tests and appropriate treatment."),
-                    ("🥗", "success", "**Diet Tips:**\n- Completely avoid alcohol\n- Reduce fatty foods\n- Eat green leafy vegetables\n- Include antioxidant-rich foods\n- Stay hydrated"),
-                    ("🏃", "success", "**Lifestyle Tips:**\n- Regular moderate exercise\n- Avoid toxin exposure\n- Maintain healthy weight\n- Vaccination for hepatitis")
-                ],
-                "None / Not Sure": [
-                    ("✅", "success", "No specific issue selected."),
-                    ("💡", "info", "**General Health Tips:**\n- Maintain balanced diet\n- Regular exercise (150 min/week)\n- Adequate sleep (7-8 hours)\n- Annual health checkups\n- Stay hydrated\n- Manage stress effectively")
-                ]
-            }
-            
-            for emoji, msg_type, msg in suggestions[issue]:
+            for emoji, msg_type, msg in rules.suggestions(issues):
                 if msg_type == "warning":
                     st.warning(f"{emoji} {msg}")
                 elif msg_type == "success":
@@ -519,6 +2597,79 @@ elif option == "🧾 Check Your Health":
     else:
         st.info("👆 Please upload a medical report image to get started.")
 
+# ------------------- ADMIN -------------------
+elif option == "🛠️ Admin":
+    st.header("🛠️ Admin")
+
+    st.markdown("### Rerun Hot Path")
+    stats = span_stats()
+    if not PROFILING:
+        st.info("Profiling is off. Start the app with `HEALTHBOT_PROFILE=1` to record spans.")
+    spans = stats.table()
+    if len(spans):
+        st.dataframe(spans.round(2), use_container_width=True)
+        col1, col2 = st.columns(2)
+        col1.download_button("Export Prometheus text", stats.to_prometheus(),
+                             file_name="healthbot_spans.prom", mime="text/plain", use_container_width=True)
+        col2.download_button("Export JSON", stats.to_json(),
+                             file_name="healthbot_spans.json", mime="application/json", use_container_width=True)
+    else:
+        st.caption("No spans recorded yet.")
+
+    st.markdown("### Precompute Scheduler")
+    if PRECOMPUTE:
+        scheduler_stats = precompute_scheduler().stats()
+        last = scheduler_stats['last_refresh']
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Queue depth", scheduler_stats['queue_depth'])
+        col2.metric("Tasks remaining", scheduler_stats['tasks_remaining'])
+        col3.metric("Last refresh", f"{last['seconds']:.2f} s" if last else "—")
+        st.caption(f"Serving data version `{data_version}`.")
+        if last:
+            st.caption(f"Last refresh of `{last['version']}` started "
+                       f"{time.time() - last['started']:,.0f} s ago.")
+            if last['error']:
+                st.error(f"Last refresh failed, still serving the previous version: {last['error']}")
+            st.table(pd.DataFrame({'Seconds': last['tasks']}).round(3))
+    else:
+        st.info("Precomputation is off. Start the app with `HEALTHBOT_PRECOMPUTE=1` to enable it.")
+
+    st.markdown("### Figure Render Cache")
+    if shared_cache() is not None:
+        st.caption("Figures and computed results are shared with the other workers on this host.")
+    st.json(figure_cache().stats())
+
+    st.markdown("### Report Image Cache")
+    st.json(report_image_store().stats())
+
+    st.markdown("### Report Reader")
+    reader = report_reader()
+    st.json(reader.stats() if reader else {'available': False})
+
+    st.markdown("### Memory")
+    memory = process_memory()
+    if memory:
+        for col, (label, value) in zip(st.columns(len(memory)), memory.items()):
+            col.metric(label, f"{value / 2**20:,.1f} MB")
+    dataset = load_dataset(DATA_PATH, data_version)
+    columns = dataset.memory()
+    mapped = columns.loc[columns['Backing'] == 'memory-mapped', 'Bytes'].sum()
+    st.caption(f"Shared dataset: {columns['Bytes'].sum() / 2**20:,.1f} MB in one copy per process, "
+               f"{mapped / 2**20:,.1f} MB of it memory-mapped and shared between processes.")
+    st.dataframe(columns, use_container_width=True, hide_index=True)
+    session = session_memory()
+    st.caption(f"This session holds {session['Bytes'].sum() / 2**20:,.2f} MB of private state "
+               f"in {len(session)} entries.")
+    if len(session):
+        st.dataframe(session, use_container_width=True)
+
+    st.markdown("### Startup Profile")
+    profile = startup_profile()
+    if profile:
+        st.table(pd.DataFrame({'Seconds': profile}).sort_values('Seconds', ascending=False).round(3))
+    else:
+        st.caption("Nothing imported yet.")
+
 # ---------- Footer ----------
 st.markdown("---")
 st.markdown("""
@@ -527,3 +2678,6 @@ st.markdown("""
         <p style='font-size: 14px;'>Made with ❤️ using Streamlit</p>
     </div>
 """, unsafe_allow_html=True)
+
+if PROFILING:
+    span_stats().record("rerun", time.perf_counter() - rerun_started)
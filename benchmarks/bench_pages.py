@@ -0,0 +1,225 @@
+"""Headless benchmark of the dashboard pages.
+
+Drives every page of app.py through Streamlit's AppTest against synthetic
+datasets of increasing size and reports per-rerun latency percentiles, peak
+RSS and matplotlib render time. Each dataset size runs in its own process so
+peak RSS and the Streamlit caches don't leak between sizes.
+
+    python benchmarks/bench_pages.py --rows 50 100000 10000000 --output baseline.json
+    python benchmarks/bench_pages.py --rows 50 100000 --compare baseline.json
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+APP_PATH = Path(__file__).resolve().parent.parent / "app.py"
+DATA_DIR = Path(tempfile.gettempdir()) / "healthbot-bench"
+GENERATE_CHUNK = 1_000_000
+
+HOME = "🏠 Home"
+BMI = "🧮 BMI Calculator"
+VISUALIZATIONS = "📊 Visualizations"
+CHECK = "🧾 Check Your Health"
+
+SERVER = "Server (PNG)"
+BROWSER = "Browser (interactive)"
+CHARTS = ["Bar Chart", "Line Chart", "Correlation Heatmap", "Distribution Plot"]
+
+# (scenario name, sidebar page, chart type, chart rendering). The plain chart names keep
+# measuring server-side PNGs so render time stays comparable with older baselines; the
+# browser runs come after them and so start with the data caches already warm
+SCENARIOS = [
+    ("Home", HOME, None, None),
+    ("BMI Calculator", BMI, None, None),
+    *[(chart, VISUALIZATIONS, chart, SERVER) for chart in CHARTS],
+    *[(f"{chart} (browser)", VISUALIZATIONS, chart, BROWSER) for chart in CHARTS],
+    ("Check Your Health", CHECK, None, None),
+]
+
+
+def generate_dataset(rows):
+    """Write a CSV shaped like load_data()'s sample, in the export's column names"""
+    path = DATA_DIR / f"health-{rows}.csv"
+    if path.exists():
+        return path
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    partial = path.with_suffix(".partial")
+    rng = np.random.default_rng(42)
+    for start in range(0, rows, GENERATE_CHUNK):
+        n = min(GENERATE_CHUNK, rows - start)
+        chunk = pd.DataFrame({
+            'Name': 'Person_' + pd.Series(np.arange(start + 1, start + n + 1)).astype(str),
+            'Age': rng.integers(20, 70, n),
+            'Height_m': np.round(rng.uniform(1.5, 1.9, n), 2),
+            'Weight_kg': np.round(rng.uniform(50, 100, n), 1),
+            'Heart_Rate': rng.integers(60, 100, n),
+            'Blood_Pressure': rng.integers(110, 140, n),
+            'Cholesterol': rng.integers(150, 250, n),
+            'Blood_Sugar': rng.integers(70, 150, n)
+        })
+        chunk.to_csv(partial, mode='w' if start == 0 else 'a', header=start == 0, index=False)
+    partial.rename(path)
+    return path
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+class RenderTimer:
+    """Accumulates time spent in Figure.savefig, which every server-side chart goes through"""
+
+    def __init__(self):
+        from matplotlib.figure import Figure
+        self.total = 0.0
+        original = Figure.savefig
+
+        def timed_savefig(fig, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return original(fig, *args, **kwargs)
+            finally:
+                self.total += time.perf_counter() - start
+
+        Figure.savefig = timed_savefig
+
+    def take(self):
+        total, self.total = self.total, 0.0
+        return total
+
+
+def run_scenario(at, page, chart, backend, reruns, timer):
+    """Time the first render of a page and then `reruns` identical reruns"""
+
+    def rerun():
+        start = time.perf_counter()
+        if page == BMI:
+            at.button[0].click()
+        at.run()
+        if at.exception:
+            raise RuntimeError(f"{page} / {chart}: {at.exception[0].message}")
+        return time.perf_counter() - start
+
+    timer.take()
+    start = time.perf_counter()
+    at.sidebar.radio[0].set_value(page)
+    if chart is not None:
+        at.run()
+        at.sidebar.radio[1].set_value(backend)
+        at.selectbox[0].set_value(chart)
+    at.run()
+    cold = time.perf_counter() - start
+    if at.exception:
+        raise RuntimeError(f"{page} / {chart}: {at.exception[0].message}")
+    cold_render = timer.take()
+
+    latencies = np.array([rerun() for _ in range(reruns)])
+    return {
+        'cold_ms': round(cold * 1000, 2),
+        'cold_render_ms': round(cold_render * 1000, 2),
+        'p50_ms': round(float(np.percentile(latencies, 50)) * 1000, 2),
+        'p95_ms': round(float(np.percentile(latencies, 95)) * 1000, 2),
+        'p99_ms': round(float(np.percentile(latencies, 99)) * 1000, 2),
+        'render_ms_per_rerun': round(timer.take() / reruns * 1000, 2),
+        'peak_rss_mb': round(peak_rss_mb(), 1)
+    }
+
+
+def bench_size(rows, reruns, timeout):
+    """Run every scenario against one dataset size (called in a fresh process)"""
+    from streamlit.testing.v1 import AppTest
+
+    os.environ['HEALTH_DATA_PATH'] = str(generate_dataset(rows))
+    os.environ['HEALTH_CACHE_DIR'] = tempfile.mkdtemp(prefix="healthbot-bench-cache-")
+    os.environ['HEALTHBOT_WARM_UP'] = "0"
+    # Background precomputation would race the cold timings
+    os.environ['HEALTHBOT_PRECOMPUTE'] = "0"
+    timer = RenderTimer()
+
+    at = AppTest.from_file(str(APP_PATH), default_timeout=timeout)
+    start = time.perf_counter()
+    at.run()
+    results = {'startup_ms': round((time.perf_counter() - start) * 1000, 2)}
+    for name, page, chart, backend in SCENARIOS:
+        results[name] = run_scenario(at, page, chart, backend, reruns, timer)
+    results['peak_rss_mb'] = round(peak_rss_mb(), 1)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Scenarios whose p50 latency regressed by more than `tolerance` against the baseline"""
+    regressions = []
+    for rows, scenarios in results['results'].items():
+        for name, stats in scenarios.items():
+            before = baseline.get('results', {}).get(rows, {}).get(name)
+            if not isinstance(stats, dict) or not before:
+                continue
+            if stats['p50_ms'] > before['p50_ms'] * (1 + tolerance):
+                regressions.append(f"{rows} rows / {name}: p50 {before['p50_ms']} -> {stats['p50_ms']} ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[50, 100_000, 10_000_000])
+    parser.add_argument('--reruns', type=int, default=20)
+    parser.add_argument('--timeout', type=float, default=600, help="seconds allowed per script run")
+    parser.add_argument('--output', type=Path, help="write the results as a JSON baseline")
+    parser.add_argument('--compare', type=Path, help="baseline JSON to check for regressions")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="allowed p50 slowdown (0.2 = 20%%)")
+    parser.add_argument('--worker', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker is not None:
+        json.dump(bench_size(args.worker, args.reruns, args.timeout), sys.stdout)
+        return 0
+
+    results = {
+        'meta': {
+            'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'reruns': args.reruns
+        },
+        'results': {}
+    }
+    for rows in args.rows:
+        print(f"Benchmarking {rows:,} rows...", file=sys.stderr)
+        worker = subprocess.run(
+            [sys.executable, __file__, '--worker', str(rows),
+             '--reruns', str(args.reruns), '--timeout', str(args.timeout)],
+            capture_output=True, text=True
+        )
+        if worker.returncode:
+            print(worker.stderr, file=sys.stderr)
+            return worker.returncode
+        results['results'][str(rows)] = json.loads(worker.stdout)
+
+    report = json.dumps(results, indent=2, ensure_ascii=False)
+    if args.output:
+        args.output.write_text(report + "\n")
+    print(report)
+
+    if args.compare:
+        regressions = compare(results, json.loads(args.compare.read_text()), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
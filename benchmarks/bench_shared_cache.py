@@ -0,0 +1,149 @@
+"""Multi-worker benchmark of the shared cache backend.
+
+Runs several worker processes against one dataset, the way several Streamlit
+processes behind a load balancer would share a host. Every worker renders the
+same Visualizations views with server-side PNGs, once with the per-process
+memory backend and once with the shared SQLite backend. Reports the cache hit
+rate, total worker time, peak RSS and how many cached bytes each process holds
+in memory. The memory backend only caches rendered figures, so its hit rate
+counts figures; the SQLite one counts figures and computed results.
+
+    python benchmarks/bench_shared_cache.py --workers 4 --rows 100000
+    python benchmarks/bench_shared_cache.py --workers 4 --concurrent --output shared.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from bench_pages import APP_PATH, VISUALIZATIONS, generate_dataset, peak_rss_mb
+
+ADMIN = "🛠️ Admin"
+BACKENDS = ["memory", "sqlite"]
+CHARTS = ["Bar Chart", "Line Chart", "Distribution Plot", "Correlation Heatmap"]
+
+
+def run_worker(rows, backend, cache_dir, timeout):
+    """One worker's session: every chart for every metric, then the cache stats from the Admin page"""
+    from streamlit.testing.v1 import AppTest
+
+    os.environ['HEALTH_DATA_PATH'] = str(generate_dataset(rows))
+    os.environ['HEALTH_CACHE_DIR'] = cache_dir
+    os.environ['HEALTHBOT_CACHE_BACKEND'] = backend
+    os.environ['HEALTHBOT_WARM_UP'] = "0"
+    os.environ['HEALTHBOT_PRECOMPUTE'] = "0"
+
+    at = AppTest.from_file(str(APP_PATH), default_timeout=timeout)
+    at.query_params['admin'] = "1"
+    at.run()
+    start = time.perf_counter()
+    at.sidebar.radio[0].set_value(VISUALIZATIONS).run()
+    at.sidebar.radio[1].set_value("Server (PNG)").run()
+    views = 0
+    for chart in CHARTS:
+        at.selectbox[0].set_value(chart).run()
+        metrics = at.selectbox[1].options if chart != "Correlation Heatmap" else [None]
+        for metric in metrics:
+            if metric is not None:
+                at.selectbox[1].set_value(metric).run()
+            if at.exception:
+                raise RuntimeError(f"{chart} / {metric}: {at.exception[0].message}")
+            views += 1
+    elapsed = time.perf_counter() - start
+
+    at.sidebar.radio[0].set_value(ADMIN).run()
+    stats = next(stats for stats in (json.loads(element.value) for element in at.json) if 'backend' in stats)
+    return {
+        'views': views,
+        'seconds': round(elapsed, 3),
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+        'cache': stats
+    }
+
+
+def run_backend(args, backend):
+    """All workers against one fresh cache directory; sequential unless --concurrent"""
+    cache_dir = tempfile.mkdtemp(prefix=f"healthbot-shared-{backend}-")
+    command = [sys.executable, __file__, '--worker', backend, cache_dir,
+               '--rows', str(args.rows), '--timeout', str(args.timeout)]
+    processes = []
+    outputs = []
+    for _ in range(args.workers):
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        if args.concurrent:
+            processes.append(process)
+        else:
+            outputs.append((process, *process.communicate()))
+    outputs += [(process, *process.communicate()) for process in processes]
+
+    workers = []
+    for process, stdout, stderr in outputs:
+        if process.returncode:
+            raise RuntimeError(f"{backend} worker failed:\n{stderr}")
+        workers.append(json.loads(stdout))
+
+    hits = sum(worker['cache']['hits'] for worker in workers)
+    misses = sum(worker['cache']['misses'] for worker in workers)
+    # The memory backend keeps a copy in every process; the sqlite one keeps a single copy on disk
+    in_process = sum(worker['cache']['bytes'] for worker in workers) if backend == "memory" else 0
+    return {
+        'workers': workers,
+        'seconds_total': round(sum(worker['seconds'] for worker in workers), 3),
+        'hit_rate': round(hits / (hits + misses), 3) if hits + misses else None,
+        'peak_rss_mb_mean': round(sum(worker['peak_rss_mb'] for worker in workers) / len(workers), 1),
+        'cached_bytes_in_processes': in_process,
+        'cached_bytes_on_disk': workers[-1]['cache']['bytes'] if backend == "sqlite" else 0
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--concurrent', action='store_true', help="start all workers at once")
+    parser.add_argument('--timeout', type=float, default=600, help="seconds allowed per script run")
+    parser.add_argument('--output', type=Path, help="write the results as JSON")
+    parser.add_argument('--worker', nargs=2, metavar=('BACKEND', 'CACHE_DIR'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker is not None:
+        json.dump(run_worker(args.rows, *args.worker, args.timeout), sys.stdout)
+        return 0
+
+    generate_dataset(args.rows)
+    results = {
+        'meta': {
+            'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'workers': args.workers,
+            'rows': args.rows,
+            'concurrent': args.concurrent
+        },
+        'results': {}
+    }
+    for backend in BACKENDS:
+        print(f"Benchmarking {args.workers} workers with the {backend} backend...", file=sys.stderr)
+        results['results'][backend] = run_backend(args, backend)
+
+    memory, shared = results['results']['memory'], results['results']['sqlite']
+    results['savings'] = {
+        'worker_time_pct': round((1 - shared['seconds_total'] / memory['seconds_total']) * 100, 1),
+        'cached_mb': round((memory['cached_bytes_in_processes'] - shared['cached_bytes_on_disk']) / 2**20, 2)
+    }
+
+    report = json.dumps(results, indent=2, ensure_ascii=False)
+    if args.output:
+        args.output.write_text(report + "\n")
+    print(report)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
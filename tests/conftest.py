@@ -0,0 +1,29 @@
+import os
+import runpy
+from pathlib import Path
+
+import pytest
+
+APP_PATH = Path(__file__).resolve().parent.parent / "app.py"
+
+
+@pytest.fixture(scope='session')
+def app(tmp_path_factory):
+    """Namespace of app.py run once in Streamlit's bare mode, with caches and history in a temp dir"""
+    root = tmp_path_factory.mktemp("healthbot")
+    env = {
+        'HEALTH_CACHE_DIR': str(root / "cache"),
+        'HEALTH_HISTORY_DIR': str(root / "history"),
+        'HEALTHBOT_WARM_UP': "0",
+        'HEALTHBOT_PRECOMPUTE': "0",
+    }
+    saved = {key: os.environ.get(key) for key in env}
+    os.environ.update(env)
+    try:
+        yield runpy.run_path(str(APP_PATH))
+    finally:
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def test_categories_at_the_bounds(app):
+    bmi = np.array([18.49, 18.5, 24.9, 24.91, 29.89, 29.9, 40.0, np.nan])
+    table = app['bmi_table'](np.ones(len(bmi)), bmi)
+    assert table['Category'].tolist()[:-1] == ['Underweight', 'Normal', 'Overweight', 'Overweight',
+                                               'Overweight', 'Obese', 'Obese']
+    assert pd.isna(table['Category'].iloc[-1]) and np.isnan(table['Scale_Position'].iloc[-1])
+    assert table['Scale_Position'].between(0, 4).iloc[:-1].all()
+
+
+def test_bmi_is_rounded_like_the_stored_column(app):
+    table = app['bmi_table']([1.75], [70])
+    assert table['BMI'].tolist() == [22.86]
+
+
+def test_batch_drops_non_positive_rows(app):
+    frame = pd.DataFrame({'Name': ['Ann', 'Bob', 'Cy', 'Di'], 'Height_m': [1.65, 0.0, 1.80, 1.70],
+                          'Weight_kg': [60, 70, -1, 95]})
+    table, counts, dropped = app['batch_bmi'](frame)
+    assert dropped == 2
+    assert table['Name'].tolist() == ['Ann', 'Di']
+    assert table['Category'].tolist() == ['Normal', 'Obese']
+    assert counts.to_dict() == {'Underweight': 0, 'Normal': 1, 'Overweight': 0, 'Obese': 1}
+
+
+def test_batch_needs_height_and_weight(app):
+    with pytest.raises(ValueError, match="Weight"):
+        app['batch_bmi'](pd.DataFrame({'Height': [1.7]}))
+
+
+def test_uploaded_csv(app):
+    data = b"Name,Height,Weight\nAnn,1.65,60\nBob,1.80,\n"
+    table, counts, dropped = app['batch_bmi_from_csv'](data)
+    assert dropped == 0 and table['Name'].tolist() == ['Ann', 'Bob']
+    assert pd.isna(table['Category'].iloc[1]) and counts.sum() == 1
+
+
+def test_export_matches_batch(app, tmp_path):
+    path = tmp_path / f"{tmp_path.name}.csv"
+    rng = np.random.default_rng(8)
+    pd.DataFrame({'Name': [f"Person_{i}" for i in range(500)], 'Age': rng.integers(20, 80, 500),
+                  'Height_m': rng.uniform(1.5, 2.0, 500).round(2),
+                  'Weight_kg': rng.integers(45, 130, 500)}).to_csv(path, index=False)
+    signature = app['data_signature'](path)
+    export = app['batch_bmi_export'](path, signature)
+    expected, _, _ = app['batch_bmi'](app['load_data'](path, signature))
+    exported = pd.read_csv(export)
+    assert exported['Name'].tolist() == expected['Name'].tolist()
+    np.testing.assert_allclose(exported['BMI'], expected['BMI'])
+    assert exported['Category'].tolist() == expected['Category'].astype(str).tolist()
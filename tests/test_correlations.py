@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+
+
+def test_correlations_match_pandas(app):
+    rng = np.random.default_rng(3)
+    frame = pd.DataFrame(rng.normal(size=(5000, 3)), columns=['a', 'b', 'c'])
+    frame['b'] += frame['a']
+    frame.loc[rng.choice(5000, 400, replace=False), 'c'] = np.nan
+    stats = app['CorrelationStats'](frame.columns)
+    for start in range(0, len(frame), 700):
+        stats.update(frame.iloc[start:start + 700])
+    pd.testing.assert_frame_equal(stats.matrix(), frame.corr(), atol=1e-12)
+
+
+def test_correlations_need_two_rows(app):
+    stats = app['CorrelationStats'](['a', 'b'])
+    stats.update(pd.DataFrame({'a': [1.0], 'b': [2.0]}))
+    assert stats.matrix().isna().all().all()
+
+
+def test_correlations_fold_in_appended_rows(app, tmp_path):
+    rng = np.random.default_rng(6)
+    frame = pd.DataFrame({
+        'Name': [f"Person_{i}" for i in range(400)],
+        'Age': rng.integers(20, 70, 400),
+        'Height_m': rng.uniform(1.5, 1.9, 400).round(2),
+        'Weight_kg': rng.uniform(50, 100, 400).round(1),
+    })
+    path = tmp_path / f"{tmp_path.name}.csv"
+    frame.iloc[:300].to_csv(path, index=False)
+    first = app['load_correlations'](path, app['data_signature'](path), None)
+    frame.iloc[300:].to_csv(path, mode='a', header=False, index=False)
+    signature = app['data_signature'](path)
+    assert app['load_dataset'](path, signature).parent is not None
+    second = app['load_correlations'](path, signature, None)
+    assert first.counts[0, 0] == 300  # The previous version's statistics are left as they were
+    expected = app['load_data'](path, signature).select_dtypes(include='number').corr()
+    pd.testing.assert_frame_equal(second.matrix(), expected, atol=1e-9)
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def cohort(app, tmp_path):
+    """A small health CSV with a blank heart rate, and the frame the app loads from it"""
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame({
+        'Name': [f"Person_{i}" for i in range(500)],
+        'Age': rng.integers(20, 70, 500),
+        'Height_m': rng.uniform(1.5, 1.9, 500).round(2),
+        'Weight_kg': rng.uniform(50, 100, 500).round(1),
+        'Heart_Rate': rng.integers(55, 100, 500).astype('float64'),
+    })
+    frame.loc[7, 'Heart_Rate'] = np.nan
+    path = tmp_path / f"{tmp_path.name}.csv"
+    frame.to_csv(path, index=False)
+    signature = app['data_signature'](path)
+    return path, signature, app['load_data'](path, signature)
+
+
+def test_lttb_keeps_endpoints_and_peaks(app):
+    x = np.arange(10_000, dtype='float64')
+    y = np.sin(x / 500)
+    y[4321] = 50.0
+    xs, ys = app['lttb'](x, y, 200)
+    assert len(xs) == 200
+    assert (xs[0], xs[-1]) == (x[0], x[-1])
+    assert np.all(np.diff(xs) > 0)
+    assert 4321 in xs
+    np.testing.assert_array_equal(ys, y[xs.astype(int)])
+
+
+def test_lttb_returns_short_series_unchanged(app):
+    x, y = np.arange(5.0), np.arange(5.0)
+    xs, ys = app['lttb'](x, y, 10)
+    assert xs is x and ys is y
+
+
+def test_age_trend_points_are_sorted_and_bounded(app, cohort):
+    path, signature, frame = cohort
+    ages, values = app['age_trend_points'](path, signature, 'Heart_Rate', None, 50)
+    assert len(ages) == 50 and np.all(np.diff(ages) >= 0)
+    present = frame.dropna(subset=['Heart_Rate'])
+    assert set(zip(ages, values)) <= set(zip(present['Age'].astype('float64'), present['Heart_Rate'].astype('float64')))
+
+
+@pytest.mark.parametrize('bin_width', [1, 5])
+def test_age_profile_matches_groupby(app, cohort, bin_width):
+    path, signature, frame = cohort
+    profile = app['age_profile'](path, signature, 'Weight', bin_width, None)
+    grouped = frame['Weight'].groupby((frame['Age'] // bin_width) * bin_width)
+    np.testing.assert_allclose(profile['mean'], grouped.mean(), rtol=1e-6)
+    np.testing.assert_array_equal(profile['count'], grouped.count())
+    np.testing.assert_allclose(profile['p25'], grouped.quantile(0.25), rtol=1e-6)
+    np.testing.assert_allclose(profile['p75'], grouped.quantile(0.75), rtol=1e-6)
@@ -0,0 +1,50 @@
+import numpy as np
+
+
+class TestBinnedIndex:
+
+    @staticmethod
+    def rows(index, low, high, n):
+        return np.flatnonzero(np.unpackbits(index.select(low, high), count=n))
+
+    def test_discrete_select_matches_mask(self, app):
+        values = np.random.default_rng(4).integers(20, 70, 1001).astype('float64')
+        values[::50] = np.nan
+        index = app['BinnedIndex'].for_column(values)
+        assert index.discrete
+        expected = np.flatnonzero((values >= 30) & (values <= 45))
+        np.testing.assert_array_equal(self.rows(index, 30, 45, len(values)), expected)
+
+    def test_continuous_select_matches_bin_edges(self, app):
+        values = np.random.default_rng(5).uniform(1.5, 1.9, 2000)
+        index = app['BinnedIndex'].for_column(values)
+        assert not index.discrete
+        low, high = index.options[2], index.options[9]
+        expected = np.flatnonzero((values >= low) & (values < high))
+        np.testing.assert_array_equal(self.rows(index, low, high, len(values)), expected)
+
+    def test_full_range_selects_every_present_row(self, app):
+        values = np.array([3.0, np.nan, 5.0, 4.0])
+        index = app['BinnedIndex'].for_column(values)
+        selected = self.rows(index, index.options[0], index.options[-1], len(values))
+        np.testing.assert_array_equal(selected, [0, 2, 3])
+
+    def test_wide_discrete_range_uses_sorted_rows(self, app):
+        values = np.random.default_rng(6).integers(0, 120, 5001).astype('float64')
+        values[::70] = np.nan
+        index = app['BinnedIndex'].for_column(values)
+        assert index.discrete and index.bitmaps is None
+        assert index.order.nbytes == 4 * len(values)
+        for low, high in [(0, 119), (17, 17), (40, 95)]:
+            expected = np.flatnonzero((values >= low) & (values <= high))
+            np.testing.assert_array_equal(self.rows(index, low, high, len(values)), expected)
+
+    def test_layouts_agree(self, app):
+        values = np.random.default_rng(7).integers(0, 60, 999).astype('float64')
+        values[::40] = np.nan
+        edges = np.arange(0, 61)
+        sorted_rows = app['BinnedIndex'](values, edges, discrete=True)
+        bitmaps = app['BinnedIndex'](values, edges[::4], discrete=True)
+        assert sorted_rows.bitmaps is None and bitmaps.order is None
+        for first, last in [(0, 3), (5, 9), (14, 14)]:
+            np.testing.assert_array_equal(sorted_rows.bins(4 * first, 4 * last + 3), bitmaps.bins(first, last))
@@ -0,0 +1,45 @@
+import pytest
+
+
+def findings(app, text):
+    return {finding['Test']: finding['Value'] for finding in app['extract_findings'](text)}
+
+
+@pytest.mark.parametrize('text, expected', [
+    ("Hb A1c 5.2 %", {}),
+    ("Hb A1c 7.1 %", {'HbA1c': "7.1 %"}),
+    ("HbA1c: 6.8", {'HbA1c': "6.8 %"}),
+    ("Hb 10.8 g/dL", {'Hemoglobin': "10.8 g/dL"}),
+    ("Haemoglobin 13.5 g/dL", {}),
+    ("Fasting glucose 140 mg/dL\nLDL 170", {'Glucose': "140 mg/dL", 'LDL': "170 mg/dL"}),
+    ("Glucose 140 fasting", {'Glucose': "140 mg/dL"}),
+    ("TSH 0.2 mIU/L", {'TSH': "0.2 mIU/L"}),
+    ("Blood pressure 150/95 mmHg", {'Blood Pressure': "150/95"}),
+    ("BP 120/80", {}),
+])
+def test_extract_findings(app, text, expected):
+    assert findings(app, text) == expected
+
+
+@pytest.mark.parametrize('text, expected', [
+    ("Creatinine 88 umol/L", {}),
+    ("Creatinine 150 µmol/L", {'Creatinine': "1.697 mg/dL (150 µmol/L)"}),
+    ("Glucose 7.8 mmol/L", {'Glucose': "140.5 mg/dL (7.8 mmol/L)"}),
+    ("Glucose 5.1 mmol/l", {}),
+    ("Total cholesterol 6.5 mmol/L", {'Total Cholesterol': "251.4 mg/dL (6.5 mmol/L)"}),
+    ("Haemoglobin 105 g/L", {'Hemoglobin': "10.5 g/dL (105 g/L)"}),
+    ("Troponin 60 ng/L", {'Troponin': "0.06 ng/mL (60 ng/L)"}),
+    ("TSH 6 uIU/mL", {'TSH': "6 mIU/L"}),
+])
+def test_other_units_are_converted(app, text, expected):
+    assert findings(app, text) == expected
+
+
+@pytest.mark.parametrize('text', ["HbA1c 58 mmol/mol", "Glucose 140 g/L", "Creatinine 2 mmol/L"])
+def test_unknown_units_are_skipped(app, text):
+    assert app['extract_findings'](text) == []
+
+
+def test_findings_carry_reference_and_condition(app):
+    [finding] = app['extract_findings']("Hemoglobin 9.1")
+    assert finding == {'Test': "Hemoglobin", 'Value': "9.1 g/dL", 'Reference': "≥ 12 g/dL", 'Condition': "Anemia"}
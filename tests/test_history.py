@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def history(app, tmp_path):
+    """Two years of daily history with gaps and missing values, plus the same data as a frame"""
+    rng = np.random.default_rng(0)
+    dates = np.arange(np.datetime64('2024-01-01'), np.datetime64('2025-12-31'))
+    dates = dates[rng.random(len(dates)) > 0.15]
+    weight = rng.normal(75, 2, len(dates))
+    weight[rng.random(len(dates)) < 0.05] = np.nan
+    steps = rng.integers(2000, 12000, len(dates)).astype('float64')
+    store = app['MetricHistory'](tmp_path)
+    # Two appends, so running sums have to carry over from what is already stored
+    half = len(dates) // 2
+    store.append("Jane Doe", dates[:half], {'Weight': weight[:half], 'Steps': steps[:half]})
+    store.append("Jane Doe", dates[half:], {'Weight': weight[half:], 'Steps': steps[half:]})
+    frame = pd.DataFrame({'Weight': weight.astype('float32'), 'Steps': steps.astype('float32')},
+                         index=pd.DatetimeIndex(dates))
+    return store, frame
+
+
+def test_rolling_mean_matches_pandas(history):
+    store, frame = history
+    result = store.query("Jane Doe", '2025-03-01', '2025-06-30', window=7)
+    expected = frame.astype('float64').rolling('7D').mean().loc['2025-03-01':'2025-06-30']
+    np.testing.assert_array_equal(result['Date'].to_numpy(), expected.index.to_numpy())
+    for metric in ('Weight', 'Steps'):
+        np.testing.assert_allclose(result[f"{metric} (7d avg)"], expected[metric], rtol=1e-9)
+        np.testing.assert_array_equal(result[metric], frame.loc['2025-03-01':'2025-06-30', metric])
+
+
+def test_weekly_means_match_pandas(history):
+    store, frame = history
+    result = store.weekly("Jane Doe", '2024-02-01', '2024-12-31')
+    expected = frame.loc['2024-02-01':'2024-12-31'].astype('float64').resample('W-MON', label='left',
+                                                                              closed='left').mean()
+    expected = expected.dropna(how='all')
+    np.testing.assert_array_equal(result['Date'].to_numpy(), expected.index.to_numpy())
+    for metric in ('Weight', 'Steps'):
+        np.testing.assert_allclose(result[metric], expected[metric], rtol=1e-9)
+
+
+def test_append_rejects_days_out_of_order(history):
+    store, _ = history
+    with pytest.raises(ValueError):
+        store.append("Jane Doe", ['2025-01-01'], {'Weight': [70.0], 'Steps': [5000.0]})
+    assert store.people() == ["Jane Doe"]
+
+
+def test_configured_store_is_not_seeded(app, tmp_path):
+    assert app['metric_history'](tmp_path).people() == []
+
+
+def test_home_page_survives_unusable_history_dir(app, tmp_path, monkeypatch):
+    from streamlit.testing.v1 import AppTest
+
+    blocker = tmp_path / "not-a-directory"
+    blocker.write_text("")
+    monkeypatch.setenv('HEALTH_HISTORY_DIR', str(blocker / "history"))
+    monkeypatch.setenv('HEALTHBOT_SEED_HISTORY', "1")
+    at = AppTest.from_file(str(app['__file__']), default_timeout=60).run()
+    assert not at.exception
+    assert "No metric history recorded yet." in [caption.value for caption in at.caption]
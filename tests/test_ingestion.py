@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+HEADER = "Name,Age,Height_m,Weight_kg,Heart_Rate,Blood_Pressure\n"
+
+
+def write_rows(path, rows, mode='w'):
+    with open(path, mode, encoding='utf-8') as f:
+        if mode == 'w':
+            f.write(HEADER)
+        f.writelines(f"Person_{i},{30 + i % 40},{1.6 + i % 30 / 100:.2f},{60 + i % 40},{60 + i % 50},"
+                     f"{110 + i % 40}\n" for i in rows)
+
+
+def test_compact_dtypes_and_bmi(app, tmp_path):
+    path = tmp_path / "health.csv"
+    write_rows(path, range(10))
+    frame = app['read_health_csv'](path, chunksize=4)
+    assert frame['Age'].dtype == 'int16' and frame['Blood_Pressure'].dtype == 'int16'
+    assert frame['Height'].dtype == 'float32' and frame['Name'].dtype == 'category'
+    expected = (frame['Weight'].astype('float64') / frame['Height'].astype('float64') ** 2).round(2)
+    np.testing.assert_allclose(frame['BMI'], expected, atol=1e-4)
+
+
+def test_blank_integer_cells_become_nan(app, tmp_path):
+    path = tmp_path / "health.csv"
+    path.write_text(HEADER + "Ann,34,1.65,60,,120\nBob,,1.80,80,72,\n")
+    frame = app['read_health_csv'](path)
+    assert frame['Heart_Rate'].dtype == 'float32' and np.isnan(frame['Heart_Rate'][0])
+    assert np.isnan(frame['Age'][1]) and np.isnan(frame['Blood_Pressure'][1])
+    assert frame['Heart_Rate'][1] == 72
+
+
+def test_blanks_in_one_chunk_only(app, tmp_path):
+    path = tmp_path / "health.csv"
+    write_rows(path, range(6))
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write("Cy,41,1.70,70,,130\n")
+    frame = app['read_health_csv'](path, chunksize=3)
+    assert frame['Heart_Rate'].dtype == 'float32'
+    assert frame['Heart_Rate'].isna().tolist() == [False] * 6 + [True]
+
+
+def test_missing_required_column(app, tmp_path):
+    path = tmp_path / "health.csv"
+    path.write_text("Name,Age\nAnn,34\n")
+    with pytest.raises(ValueError, match="Height_m, Weight_kg"):
+        app['read_health_csv'](path)
+
+
+def test_append_reads_only_new_rows(app, tmp_path):
+    path = tmp_path / "appended.csv"
+    write_rows(path, range(100))
+    first = app['data_signature'](path)
+    frame, _, parent = app['load_health_csv'](path, first)
+    assert parent is None and len(frame) == 100
+
+    write_rows(path, range(100, 150), mode='a')
+    second = app['data_signature'](path)
+    frame, _, parent = app['load_health_csv'](path, second)
+    assert parent == (first, 100)
+    pd.testing.assert_frame_equal(frame, app['read_health_csv'](path), check_categorical=False)
+
+
+def test_rewritten_file_is_read_in_full(app, tmp_path):
+    path = tmp_path / "rewritten.csv"
+    write_rows(path, range(100))
+    app['load_health_csv'](path, app['data_signature'](path))
+
+    write_rows(path, range(200, 260))
+    frame, _, parent = app['load_health_csv'](path, app['data_signature'](path))
+    assert parent is None
+    assert frame['Name'].tolist() == [f"Person_{i}" for i in range(200, 260)]
@@ -0,0 +1,68 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+DATA = Path(__file__).resolve().parent.parent / "health_data.csv"
+
+
+@pytest.fixture
+def data(tmp_path):
+    path = tmp_path / f"{tmp_path.name}.csv"  # Arrow copies are keyed on the file name
+    shutil.copy(DATA, path)
+    return path
+
+
+def append_row(path, i):
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(f"Extra_{i},40,1.70,70,8000,7.0,2.0,70\n")
+
+
+def test_refresh_publishes_after_every_task(app, data):
+    scheduler = app['PrecomputeScheduler'](data, interval=60)
+    signature = app['data_signature'](data)
+    assert scheduler.version() == signature  # Nothing published yet: read the file directly
+    scheduler.refresh(signature)
+    stats = scheduler.stats()
+    assert stats['published_version'] == signature and stats['tasks_remaining'] == 0
+    record = stats['last_refresh']
+    assert record['error'] is None
+    assert list(record['tasks']) == [name for name, _ in app['precompute_tasks'](data, signature)]
+
+
+def test_failed_refresh_keeps_serving_previous_version(app, data):
+    scheduler = app['PrecomputeScheduler'](data, interval=60)
+    signature = app['data_signature'](data)
+    scheduler.refresh(signature)
+    data.unlink()  # Gone again by the time the next version is built
+    scheduler.refresh("0-0")
+    assert scheduler.version() == signature
+    assert scheduler.stats()['last_refresh']['error'] is not None
+
+
+def test_only_two_versions_stay_published(app, data):
+    scheduler = app['PrecomputeScheduler'](data, interval=60)
+    rules = app['data_signature'](app['RULES_PATH'])
+    versions = []
+    for i in range(3):
+        versions.append(app['data_signature'](data))
+        scheduler.refresh(versions[-1])
+        if i == 0:
+            first_screening = app['cohort_screening'](data, versions[0], rules)
+            assert app['cohort_screening'](data, versions[0], rules) is first_screening
+        append_row(data, i)
+
+    assert scheduler.published == versions[1:]
+    assert scheduler.version() == versions[-1]
+    # The retired version's cached artifacts were dropped, so asking again rebuilds them
+    assert app['cohort_screening'](data, versions[0], rules) is not first_screening
+
+
+def test_check_queues_only_changed_versions(app, data):
+    scheduler = app['PrecomputeScheduler'](data, interval=60)
+    scheduler.check()
+    scheduler.check()
+    assert scheduler.queue.qsize() == 1
+    append_row(data, 0)
+    scheduler.check()
+    assert scheduler.queue.get() != scheduler.queue.get()
@@ -0,0 +1,57 @@
+import io
+import time
+
+import pytest
+from PIL import Image
+
+
+def png(size, mode='RGB'):
+    buffer = io.BytesIO()
+    Image.new(mode, size, 'white').save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+def settle(store, digest):
+    deadline = time.monotonic() + 30
+    while store.is_pending(digest) and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_small_image_is_ready_in_the_same_rerun(app):
+    store = app['ReportImageStore'](workers=1)
+    display, thumbnail = store.get("small", png((800, 600)))
+    assert Image.open(io.BytesIO(display)).format == 'JPEG'
+    assert max(Image.open(io.BytesIO(thumbnail)).size) <= max(app['REPORT_THUMBNAIL_SIZE'])
+
+
+def test_slow_image_returns_none_until_prepared(app):
+    store = app['ReportImageStore'](workers=1)
+    data = png((4000, 3000))
+    assert store.get("large", data, timeout=0) is None
+    assert store.stats()['pending'] == 1
+    settle(store, "large")
+    display, _ = store.get("large", data, timeout=0)
+    assert max(Image.open(io.BytesIO(display)).size) <= max(app['REPORT_DISPLAY_SIZE'])
+    assert store.stats()['pending'] == 0
+
+
+def test_transparency_is_flattened_onto_white(app):
+    store = app['ReportImageStore'](workers=1)
+    display, _ = store.get("transparent", png((100, 100), mode='RGBA'))
+    assert Image.open(io.BytesIO(display)).getpixel((50, 50))[0] > 240
+
+
+def test_unreadable_upload_fails_once(app):
+    store = app['ReportImageStore'](workers=1)
+    with pytest.raises(OSError):
+        store.get("broken", b"not an image")
+    settle(store, "broken")
+    first = store.submit("broken", b"not an image")
+    assert store.submit("broken", b"not an image") is first  # Remembered, not decoded again
+    assert store.stats()['failed'] == 1
+
+
+def test_decompression_bomb_is_refused(app):
+    store = app['ReportImageStore'](workers=1)
+    with pytest.raises(Image.DecompressionBombError):
+        store.get("bomb", png((20000, 20000), mode='1'))
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def rules(app):
+    return app['WellnessRules'].from_file(app['RULES_PATH'])
+
+
+def test_flags_match_thresholds(rules):
+    frame = pd.DataFrame({
+        'Blood_Sugar': [90, 127, 126, 150],
+        'Blood_Pressure': [120, 140, 139, 150],
+        'Cholesterol': [180, 200, 240, 250],
+        'BMI': [22.0, 31.0, 29.89, 29.9],
+    })
+    flags = rules.flag(frame)
+    assert flags['Diabetes'].tolist() == [False, True, False, True]
+    assert flags['High Blood Pressure'].tolist() == [False, True, False, True]
+    assert flags['High Cholesterol'].tolist() == [False, False, True, True]
+    assert flags['Obesity'].tolist() == [False, True, False, True]
+    # Heart Disease needs at least two of the four factors
+    assert flags['Heart Disease'].tolist() == [False, True, False, True]
+
+
+def test_suggestions_merge_shared_advice(rules):
+    messages = rules.suggestions(["Diabetes", "Obesity", "Diabetes"])
+    alerts = [text for _, kind, text in messages if kind == "warning"]
+    assert len(alerts) == 2
+    assert rules.suggestions([])[0][1] == "success"
+
+
+def test_obesity_matches_the_bmi_categories(app, rules):
+    bmi = [29.85, 29.89, 29.9, 29.95, 30.0, 31.2]
+    categories = app['bmi_table'](np.ones(len(bmi)), bmi)['Category']
+    # Stored the way ingestion stores BMI: rounded to 2 decimals in float32
+    flags = rules.flag(pd.DataFrame({'BMI': np.array(bmi, dtype='float32')}))
+    assert flags['Obesity'].tolist() == (categories == "Obese").tolist()
+    assert flags['Obesity'].tolist() == [False, False, True, True, True, True]
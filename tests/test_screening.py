@@ -0,0 +1,70 @@
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+DATA = Path(__file__).resolve().parent.parent / "health_data.csv"
+
+
+@pytest.fixture
+def rules(app):
+    return app['WellnessRules'].from_file(app['RULES_PATH'])
+
+
+def test_composite_skipped_without_enough_factors(rules):
+    flags = rules.flag(pd.DataFrame({'BMI': [22.0, 35.0]}))
+    assert list(flags.columns) == ['Obesity']
+
+
+def test_composite_uses_the_factors_present(rules):
+    flags = rules.flag(pd.DataFrame({'BMI': [35.0, 35.0, 22.0], 'Blood_Sugar': [130, 100, 130]}))
+    assert flags['Heart Disease'].tolist() == [True, False, False]
+
+
+def screened_csv(tmp_path, rows):
+    rng = np.random.default_rng(0)
+    path = tmp_path / f"{tmp_path.name}.csv"
+    pd.DataFrame({
+        'Name': [f"Person_{i}" for i in range(rows)],
+        'Age': rng.integers(20, 70, rows),
+        'Height_m': rng.uniform(1.5, 1.9, rows).round(2),
+        'Weight_kg': rng.uniform(50, 110, rows).round(1),
+        'Blood_Pressure': rng.integers(110, 160, rows),
+        'Cholesterol': rng.integers(150, 280, rows),
+        'Blood_Sugar': rng.integers(70, 160, rows),
+    }).to_csv(path, index=False)
+    return path
+
+
+def test_cohort_screening_matches_row_by_row_rules(app, tmp_path):
+    path = screened_csv(tmp_path, 300)
+    signature, rules_signature = app['data_signature'](path), app['data_signature'](app['RULES_PATH'])
+    flags, prevalence = app['cohort_screening'](path, signature, rules_signature)
+    frame = app['load_data'](path, signature)
+    factors = pd.DataFrame({
+        'Diabetes': frame['Blood_Sugar'] > 126,
+        'High Blood Pressure': frame['Blood_Pressure'] >= 140,
+        'High Cholesterol': frame['Cholesterol'] >= 240,
+        'Obesity': frame['BMI'] >= np.float32(29.9),
+    })
+    for condition in factors:
+        assert flags[condition].tolist() == factors[condition].tolist()
+    assert flags['Heart Disease'].tolist() == (factors.sum(axis=1) >= 2).tolist()
+    assert prevalence['Heart Disease'] == pytest.approx((factors.sum(axis=1) >= 2).mean())
+
+
+def test_heart_chart_is_labelled_as_risk(app, tmp_path):
+    path = screened_csv(tmp_path, 300)
+    signature, rules_signature = app['data_signature'](path), app['data_signature'](app['RULES_PATH'])
+    chart = app['heart_pie_chart'](path, signature, rules_signature)
+    assert chart.layout.title.text == "Heart Disease Risk (≥2 of 4 risk factors)"
+    assert set(chart.data[0].labels) == {"At risk", "Not at risk"}
+
+
+def test_no_heart_chart_without_enough_factors(app, tmp_path):
+    path = tmp_path / f"{tmp_path.name}.csv"
+    shutil.copy(DATA, path)  # The bundled data only has BMI among the risk factors
+    rules_signature = app['data_signature'](app['RULES_PATH'])
+    assert app['heart_pie_chart'](path, app['data_signature'](path), rules_signature) is None
@@ -0,0 +1,55 @@
+import time
+
+import pytest
+
+
+@pytest.fixture
+def store(app, tmp_path):
+    return app['SqliteCache'](tmp_path / "shared.sqlite", max_bytes=100, ttl=60)
+
+
+def test_round_trip_and_counts(store):
+    assert store.get(("Bar Chart", "Age")) is None
+    store.put(("Bar Chart", "Age"), b"png")
+    assert store.get(("Bar Chart", "Age")) == b"png"
+    stats = store.stats()
+    assert (stats['entries'], stats['bytes'], stats['hits'], stats['misses']) == (1, 3, 1, 1)
+
+
+def test_expired_entries_are_misses(app, tmp_path):
+    store = app['SqliteCache'](tmp_path / "shared.sqlite", ttl=0.05)
+    store.put("key", b"value")
+    time.sleep(0.1)
+    assert store.get("key") is None
+    store.put("other", b"value")  # Writes sweep out expired entries
+    assert store.stats()['entries'] == 1
+
+
+def test_least_recently_used_evicted_past_max_bytes(store):
+    for key in "abc":
+        store.put(key, bytes(40))
+        time.sleep(0.01)
+    assert store.get("a") is None
+    store.get("b")
+    time.sleep(0.01)
+    store.put("d", bytes(40))
+    assert store.get("b") is not None and store.get("c") is None
+    assert store.stats()['bytes'] <= 100
+
+
+def test_oversized_values_are_not_stored(store):
+    store.put("big", bytes(101))
+    assert store.get("big") is None
+
+
+def test_other_versions_are_not_read(app, tmp_path):
+    path = tmp_path / "shared.sqlite"
+    app['SqliteCache'](path, version="old").put(("Home", "theme"), b"old drawing")
+    assert app['SqliteCache'](path, version="new").get(("Home", "theme")) is None
+    assert app['SqliteCache'](path, version="old").get(("Home", "theme")) == b"old drawing"
+
+
+def test_processes_share_one_file(app, tmp_path):
+    path = tmp_path / "shared.sqlite"
+    app['SqliteCache'](path).put("summary", b"data")
+    assert app['SqliteCache'](path).get("summary") == b"data"
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+QUANTILES = [0, 0.05, 0.25, 0.5, 0.75, 0.95, 1]
+
+
+def summarize(app, values, chunks=1):
+    summary = app['ColumnSummary']()
+    for chunk in np.array_split(values, chunks):
+        summary.update(chunk)
+    return summary
+
+
+@pytest.mark.parametrize('chunks', [1, 7])
+def test_integer_quantiles_are_exact(app, chunks):
+    values = np.random.default_rng(0).integers(20, 70, 10_001)
+    summary = summarize(app, values, chunks)
+    assert [summary.quantile(q) for q in QUANTILES] == pytest.approx(np.quantile(values, QUANTILES))
+
+
+def test_tied_integers_are_not_blended(app):
+    values = np.array([44] * 10 + [45] * 9)
+    assert summarize(app, values).quantile(0.5) == 44
+
+
+def test_sketch_takes_over_when_range_grows(app):
+    summary = summarize(app, np.arange(100))
+    assert summary.counts is not None
+    summary.update([10_000.0])
+    assert summary.counts is None
+    values = np.r_[np.arange(100), 10_000]
+    assert summary.quantile(0.5) == pytest.approx(np.median(values), abs=1)
+    assert summary.quantile(1) == 10_000
+
+
+def test_sketch_quantiles_track_numpy(app):
+    values = np.random.default_rng(1).normal(100, 15, 50_000)
+    summary = summarize(app, values, chunks=5)
+    assert summary.counts is None
+    assert summary.count == len(values)
+    assert summary.mean == pytest.approx(values.mean())
+    assert summary.min == values.min() and summary.max == values.max()
+    for q in (0.05, 0.25, 0.5, 0.75, 0.95):
+        assert summary.quantile(q) == pytest.approx(np.quantile(values, q), abs=0.5)
+
+
+def test_sketch_ignores_nan_and_zero_weights(app):
+    sketch = app['QuantileSketch']()
+    sketch.update([1.0, np.nan, 2.0, 3.0], [1, 1, 0, 1])
+    assert sketch.weights.sum() == 2
+    assert sketch.quantile(0.5) == pytest.approx(2.0)
+
+
+def test_append_rows_matches_full_build(app):
+    rng = np.random.default_rng(2)
+    frame = pd.DataFrame({'Age': rng.integers(20, 70, 3000), 'BMI': rng.uniform(18, 35, 3000)})
+    full = app['build_summaries'](frame)
+    appended = app['build_summaries'](frame.iloc[:2000])
+    app['append_rows'](appended, frame.iloc[2000:], chunksize=300)
+    for col in frame:
+        assert appended[col].count == full[col].count
+        assert appended[col].mean == pytest.approx(full[col].mean)
+        assert (appended[col].min, appended[col].max) == (full[col].min, full[col].max)
+    assert appended['Age'].quantile(0.5) == full['Age'].quantile(0.5) == np.median(frame['Age'])